@@ -1,96 +1,417 @@
-from fastapi import FastAPI, Response, Query
+from fastapi import FastAPI, HTTPException, Request, Response, Query
+from pydantic import BaseModel, ConfigDict, Field
 from generators import stats_card, lang_card, contrib_card, recent_activity_card
+from generators.svg_optimizer import optimize_svg
 from utils import github_api
-from typing import Optional
+from utils.cache import MISS, STALE
+from utils.contributions import as_calendar
+from utils.response_cache import ResponseCache, make_key, etag_matches
+from utils.tokens import get_pool
+from utils.prewarm import PREWARM_ENABLED, Prewarmer
+from utils import metrics
+from utils.timing import ServerTimingMiddleware, span
+from contextlib import asynccontextmanager
+from themes.styles import THEMES
+from themes.resolve import normalize_overrides, cache_info as theme_cache_info
+from typing import List, Optional, Union
+import asyncio
+import datetime
+import hashlib
+import os
 
-app = FastAPI()
+response_cache = ResponseCache()
+
+# Keeps the most requested users' profiles fresh ahead of their expiry
+prewarmer = Prewarmer(github_api.profile_cache, github_api.refresh_github_data_async)
+
+@asynccontextmanager
+async def lifespan(app):
+    if PREWARM_ENABLED:
+        prewarmer.start()
+    yield
+    await prewarmer.stop()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware, theme_label=lambda theme: canonical_theme(theme))
+# Server-Timing header on every response, plus the GITCANVAS_SLOW_REQUEST_MS log
+app.add_middleware(ServerTimingMiddleware)
+
+MAX_BATCH_ITEMS = int(os.getenv("GITCANVAS_MAX_BATCH_ITEMS", "1000"))
 
 @app.get("/")
 def read_root():
     return {"message": "GitCanvas API is running"}
 
+@app.get("/api/health")
+def health():
+    """Remaining GitHub budget per token plus cache and coalescing counters."""
+    pool = get_pool()
+    return {
+        "status": "ok" if pool.headroom("core") > 0 else "degraded",
+        "rate_limit": {
+            "core_headroom": round(pool.headroom("core"), 4),
+            "graphql_headroom": round(pool.headroom("graphql"), 4),
+            "tokens": pool.snapshot(),
+        },
+        "caches": {
+            "profile": github_api.profile_cache.stats(),
+            "events": github_api.events_cache.stats(),
+            "response": response_cache.stats(),
+            "theme": theme_cache_info(),
+        },
+        "prewarm": prewarmer.stats(),
+        "singleflight": {
+            "profile": github_api.profile_flight.stats(),
+            "events": github_api.events_flight.stats(),
+        },
+    }
+
+def collect_metrics():
+    """Cache, coalescing and rate-limit values read at scrape time."""
+    caches = {
+        "profile": github_api.profile_cache.stats(),
+        "events": github_api.events_cache.stats(),
+        "response": response_cache.stats(),
+    }
+    yield ("gitcanvas_cache_lookups_total", "counter", "Cache lookups by cache and result.", [
+        ({"cache": name, "result": result}, stats[field])
+        for name, stats in caches.items()
+        for result, field in (("hit", "hits"), ("stale", "stale"), ("miss", "misses"))
+    ])
+    yield ("gitcanvas_cache_entries", "gauge", "Entries currently held per cache.", [
+        ({"cache": name}, stats["size"]) for name, stats in caches.items()
+    ])
+    yield ("gitcanvas_cache_bytes", "gauge", "Weight (bytes for the response cache) held per cache.", [
+        ({"cache": name}, stats["weight"]) for name, stats in caches.items()
+    ])
+    flights = {"profile": github_api.profile_flight, "events": github_api.events_flight}
+    yield ("gitcanvas_singleflight_deduplicated_total", "counter", "Calls served by another caller's fetch.", [
+        ({"flight": name}, flight.deduplicated) for name, flight in flights.items()
+    ])
+    yield ("gitcanvas_singleflight_in_flight", "gauge", "Coalesced upstream fetches in progress.", [
+        ({"flight": name}, flight.in_flight()) for name, flight in flights.items()
+    ])
+    remaining, limits = [], []
+    for token in get_pool().snapshot():
+        for resource, budget in token["budgets"].items():
+            labels = {"token": token["token"], "resource": resource}
+            remaining.append((labels, budget["remaining"]))
+            limits.append((labels, budget["limit"]))
+    yield ("gitcanvas_ratelimit_remaining", "gauge", "GitHub requests left in the current window per token.", remaining)
+    yield ("gitcanvas_ratelimit_limit", "gauge", "GitHub hourly request limit per token.", limits)
+
+metrics.REGISTRY.register_collector(collect_metrics)
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of request, upstream, cache and rate-limit metrics."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 def parse_colors(bg_color, title_color, text_color, border_color):
-    """Helper to construct custom color dict only if values are provided."""
-    colors = {}
-    if bg_color: colors["bg_color"] = f"#{bg_color}" if not bg_color.startswith("#") else bg_color
-    if title_color: colors["title_color"] = f"#{title_color}" if not title_color.startswith("#") else title_color
-    if text_color: colors["text_color"] = f"#{text_color}" if not text_color.startswith("#") else text_color
-    if border_color: colors["border_color"] = f"#{border_color}" if not border_color.startswith("#") else border_color
-    return colors if colors else None
+    """
+    Helper to construct custom color dict only if values are provided.
+    Colors are validated and normalized ('FFF' -> '#fff'); invalid ones are a 400.
+    """
+    try:
+        colors = normalize_overrides({
+            "bg_color": bg_color, "title_color": title_color, "text_color": text_color, "border_color": border_color,
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return dict(colors) if colors else None
+
+def canonical_theme(theme):
+    """Unknown themes render as Default, so they share its cache entries."""
+    return theme if theme in THEMES else "Default"
+
+async def cached_svg(request, key, render):
+    """
+    Serve a rendered card from the response cache.
+    `render` is a coroutine function producing the SVG text, or (text, cacheable);
+    uncacheable cards are sent with Cache-Control: no-store.
+    Answers If-None-Match with 304, sends the (cached) gzip/brotli
+    variant the client accepts, and reports HIT/MISS/STALE in X-Cache.
+    """
+    with span("cache"):
+        entry, state = await response_cache.afetch_rendered(key, render)
+    body, encoding, etag = entry.representation(request.headers.get("accept-encoding"))
+    headers = {
+        "Vary": "Accept-Encoding",
+        "X-Cache": "MISS" if state == MISS else "STALE" if state == STALE else "HIT",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if not entry.cacheable:
+        # Placeholder card: no validator, and no copies in camo or other caches
+        headers["Cache-Control"] = "no-store"
+        return Response(content=body, media_type=entry.media_type, headers=headers)
+    headers["ETag"] = etag
+    headers["Cache-Control"] = f"public, max-age={int(response_cache.ttl)}"
+    # Any representation of the same body is still current
+    if any(etag_matches(request.headers.get("if-none-match"), tag) for tag in entry.etags()):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=entry.media_type, headers=headers)
+
+def parse_exclude(exclude):
+    """Comma-separated string (or list) of languages to a clean list."""
+    if not exclude:
+        return []
+    if isinstance(exclude, str):
+        exclude = exclude.split(',')
+    return [lang.strip() for lang in exclude if lang.strip()]
+
+def parse_date_range(date_from, date_to):
+    """Optional from/to dates (YYYY-MM-DD); invalid or reversed ranges are a 400."""
+    try:
+        start = datetime.date.fromisoformat(date_from) if date_from else None
+        end = datetime.date.fromisoformat(date_to) if date_to else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="from/to must be dates like 2025-01-31")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    return start, end
+
+def in_date_range(data, start, end):
+    """Profile data with its contribution calendar narrowed to start..end (a view, not a copy)."""
+    if not start and not end:
+        return data
+    return dict(data, contributions=as_calendar(data.get("contributions")).between(start, end))
+
+def card_spec(card, username, theme, custom_colors, options):
+    """
+    Cache key and draw(data) function for a profile-backed card.
+    `options` holds the card's query options (hide_* flags, exclude, compact,
+    and from/to for contributions).
+    """
+    compact = {"compact": True} if options.get("compact") else {}
+    if card == "stats":
+        show_options = {
+            name: not options.get(f"hide_{name}", False)
+            for name in ("stars", "commits", "repos", "followers")
+        }
+        key = make_key("stats", username, theme, custom_colors, **show_options, **compact)
+        draw = lambda data: stats_card.draw_stats_card(data, theme, show_options=show_options, custom_colors=custom_colors)
+    elif card == "languages":
+        excluded_languages = parse_exclude(options.get("exclude"))
+        key = make_key("languages", username, theme, custom_colors, exclude=excluded_languages, **compact)
+        draw = lambda data: lang_card.draw_lang_card(data, theme, custom_colors=custom_colors, excluded_languages=excluded_languages)
+    elif card == "contributions":
+        start, end = parse_date_range(options.get("from"), options.get("to"))
+        date_range = {name: day.isoformat() for name, day in (("from", start), ("to", end)) if day}
+        key = make_key("contributions", username, theme, custom_colors, **date_range, **compact)
+        draw = lambda data: contrib_card.draw_contrib_card(in_date_range(data, start, end), theme, custom_colors=custom_colors)
+    else:
+        raise ValueError(f"Unknown card: {card}")
+    return key, compacted(draw) if compact else draw
+
+def compacted(draw):
+    """Wrap a draw function so its output goes through the SVG optimizer."""
+    def draw_compact(data):
+        svg = draw(data)
+        with span("optimize"):
+            return optimize_svg(svg)
+    return draw_compact
+
+def draw_profile(draw, username, data):
+    """
+    (svg, cacheable) for a card: without live data (unknown user, rate limit,
+    outage) the card is drawn from placeholder data and must not be cached.
+    """
+    if data is None:
+        return draw(github_api.get_mock_data(username)), False
+    return draw(data), True
+
+async def cached_card(request, card, username, theme, custom_colors, options):
+    prewarmer.record(username)
+    key, draw = card_spec(card, username, theme, custom_colors, options)
+
+    async def render():
+        with span("data"):
+            data = await github_api.get_live_github_data_async(username)
+        with span("draw"):
+            return draw_profile(draw, username, data)
+
+    return await cached_svg(request, key, render)
 
 @app.get("/api/stats")
 async def get_stats(
+    request: Request,
     username: str, 
     theme: str = "Default", 
     hide_stars: bool = False,
     hide_commits: bool = False,
     hide_repos: bool = False,
     hide_followers: bool = False,
+    compact: bool = False,
     bg_color: Optional[str] = None,
     title_color: Optional[str] = None,
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
-    
-    show_options = {
-        "stars": not hide_stars,
-        "commits": not hide_commits,
-        "repos": not hide_repos,
-        "followers": not hide_followers
+    options = {
+        "hide_stars": hide_stars,
+        "hide_commits": hide_commits,
+        "hide_repos": hide_repos,
+        "hide_followers": hide_followers,
+        "compact": compact,
     }
-    
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    svg_content = stats_card.draw_stats_card(data, theme, show_options=show_options, custom_colors=custom_colors)
-    return Response(content=svg_content, media_type="image/svg+xml")
+    return await cached_card(request, "stats", username, canonical_theme(theme), custom_colors, options)
 
 @app.get("/api/languages")
 async def get_languages(
+    request: Request,
     username: str,
     theme: str = "Default",
     exclude: Optional[str] = None,
+    compact: bool = False,
     bg_color: Optional[str] = None,
     title_color: Optional[str] = None,
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    
-    # Parse exclude parameter into list of languages
-    excluded_languages = []
-    if exclude:
-        excluded_languages = [lang.strip() for lang in exclude.split(',') if lang.strip()]
-    
-    svg_content = lang_card.draw_lang_card(data, theme, custom_colors=custom_colors, excluded_languages=excluded_languages)
-    return Response(content=svg_content, media_type="image/svg+xml")
+    return await cached_card(request, "languages", username, canonical_theme(theme), custom_colors, {"exclude": exclude, "compact": compact})
 
 @app.get("/api/contributions")
 async def get_contributions(
+    request: Request,
     username: str,
     theme: str = "Default",
+    compact: bool = False,
+    date_from: Optional[str] = Query(None, alias="from", description="first day (YYYY-MM-DD) to draw"),
+    date_to: Optional[str] = Query(None, alias="to", description="last day (YYYY-MM-DD) to draw"),
     bg_color: Optional[str] = None,
     title_color: Optional[str] = None,
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    svg_content = contrib_card.draw_contrib_card(data, theme, custom_colors=custom_colors)
-    return Response(content=svg_content, media_type="image/svg+xml")
+    options = {"compact": compact, "from": date_from, "to": date_to}
+    return await cached_card(request, "contributions", username, canonical_theme(theme), custom_colors, options)
 
 
 @app.get("/api/recent")
 async def get_recent(
+    request: Request,
     username: str,
     theme: str = "Default",
     token: Optional[str] = None,
+    compact: bool = False,
     bg_color: Optional[str] = None,
     title_color: Optional[str] = None,
     text_color: Optional[str] = None,
     border_color: Optional[str] = None
 ):
-    data = github_api.get_live_github_data(username) or github_api.get_mock_data(username)
+    theme = canonical_theme(theme)
     custom_colors = parse_colors(bg_color, title_color, text_color, border_color)
-    svg_content = recent_activity_card.draw_recent_activity_card({'username': username}, theme, custom_colors=custom_colors, token=token)
-    return Response(content=svg_content, media_type="image/svg+xml")
+    # A token can expose private events, so responses are only shared between identical tokens
+    token_id = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else None
+    key = make_key("recent", username, theme, custom_colors, token=token_id, **({"compact": True} if compact else {}))
+    draw = lambda activity: recent_activity_card.draw_recent_activity_card(activity, theme, custom_colors=custom_colors)
+    if compact:
+        draw = compacted(draw)
+
+    async def render():
+        with span("data"):
+            activity = await github_api.get_recent_activity_async(username, token=token)
+        with span("draw"):
+            return draw(activity)
+
+    return await cached_svg(request, key, render)
+
+
+class BatchOptions(BaseModel):
+    """A batch item's card options, typed like the single-card query parameters ("false" is False)."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    hide_stars: bool = False
+    hide_commits: bool = False
+    hide_repos: bool = False
+    hide_followers: bool = False
+    compact: bool = False
+    exclude: Union[str, List[str], None] = None
+    date_from: Optional[str] = Field(None, alias="from")
+    date_to: Optional[str] = Field(None, alias="to")
+    bg_color: Optional[str] = None
+    title_color: Optional[str] = None
+    text_color: Optional[str] = None
+    border_color: Optional[str] = None
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    username: str
+    card: str = Field(description="stats, languages or contributions")
+    theme: str = "Default"
+    options: BatchOptions = BatchOptions()
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+
+@app.post("/api/batch")
+async def batch(body: BatchRequest):
+    """
+    Render many cards for many users in one request.
+    Distinct users are fetched together (aliased GraphQL with a token) and
+    the cards are rendered concurrently. Returns
+    {"cards": {id: {"svg", "etag", "cache"}}, "errors": {id: message}};
+    an item's id defaults to its index in the request.
+    """
+    if len(body.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ITEMS} items per batch")
+
+    specs, errors = {}, {}
+    for index, item in enumerate(body.items):
+        item_id = item.id or str(index)
+        options = item.options.model_dump(by_alias=True)
+        try:
+            custom_colors = parse_colors(
+                options.get("bg_color"), options.get("title_color"), options.get("text_color"), options.get("border_color")
+            )
+            key, draw = card_spec(item.card, item.username, canonical_theme(item.theme), custom_colors, options)
+        except HTTPException as e:
+            errors[item_id] = e.detail
+            continue
+        except ValueError as e:
+            errors[item_id] = str(e)
+            continue
+        specs[item_id] = (item.username, key, draw)
+        prewarmer.record(item.username)
+
+    # Only users with at least one card missing from the response cache need data
+    with span("cache"):
+        needed = [username for username, key, _ in specs.values() if response_cache.lookup(key)[1] == MISS]
+    with span("data"):
+        profiles = await github_api.get_many_github_data_async(needed) if needed else {}
+
+    async def render_item(username, key, draw):
+        async def render():
+            user_key = username.strip().lower()
+            with span("data"):
+                if user_key in profiles:
+                    data = profiles[user_key]
+                else:
+                    data = await github_api.get_live_github_data_async(username)
+            with span("draw"):
+                return await asyncio.to_thread(draw_profile, draw, username, data)
+        with span("cache"):
+            return await response_cache.afetch_rendered(key, render)
+
+    results = await asyncio.gather(*(render_item(*spec) for spec in specs.values()), return_exceptions=True)
+
+    cards = {}
+    for item_id, result in zip(specs, results):
+        if isinstance(result, BaseException):
+            errors[item_id] = str(result)
+            continue
+        entry, state = result
+        cards[item_id] = {
+            "svg": entry.body.decode("utf-8"),
+            # Placeholder cards get no validator
+            "etag": entry.etag if entry.cacheable else None,
+            "cache": "MISS" if state == MISS else "STALE" if state == STALE else "HIT",
+        }
+    return {"cards": cards, "errors": errors}
@@ -6,6 +6,7 @@ from roast_widget_streamlit import render_roast_widget  # type: ignore
 from generators import stats_card, lang_card, contrib_card, badge_generator, recent_activity_card  # type: ignore
 from utils import github_api  # type: ignore
 from themes.styles import THEMES  # type: ignore
+from themes.resolve import resolve_theme  # type: ignore
 
 # Load environment variables
 load_dotenv()
@@ -58,7 +59,7 @@ with st.sidebar:
     custom_colors = {}
     with st.expander("Customize Colors", expanded=False):
         st.caption("Override theme defaults")
-        default_theme = THEMES.get(selected_theme, THEMES["Default"]).copy() # Copy to avoid mutating global
+        default_theme = resolve_theme(selected_theme)
         
         # Helper to get color safely
         def get_col(key): return default_theme.get(key, "#000000")
@@ -76,6 +77,8 @@ with st.sidebar:
         if custom_border != get_col("border_color"): custom_colors["border_color"] = custom_border
 
     if st.button("Refresh Data", use_container_width=True):
+        # Bypass the shared profile cache and on-disk store as well
+        github_api.refresh_github_data(username if username else "torvalds")
         st.cache_data.clear()
     github_token = st.text_input("GitHub Token (optional)", type="password")
         
@@ -93,9 +96,7 @@ def load_data(user):
 data = load_data(username if username else "torvalds")
 
 # Apply custom colors to current theme for python logic
-current_theme_opts = THEMES.get(selected_theme, THEMES["Default"]).copy()
-if custom_colors:
-    current_theme_opts.update(custom_colors)
+current_theme_opts = resolve_theme(selected_theme, custom_colors)
 
 # --- Layout: Tabs ---
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Main Stats", "Languages", "Contributions", "Icons & Badges", "🔥 AI Roast", "Recent Activity"])
@@ -276,10 +277,11 @@ with tab6:
     with col1:
         st.caption("Theme: **{}**".format(selected_theme))
         try:
-            svg_bytes = recent_activity_card.draw_recent_activity_card({'username': username}, selected_theme, custom_colors, token=github_token)
+            activity = github_api.get_recent_activity(username, token=github_token)
+            svg_bytes = recent_activity_card.draw_recent_activity_card(activity, selected_theme, custom_colors)
         except Exception as e:
             st.error(f"Error rendering recent activity: {e}")
-            svg_bytes = recent_activity_card._render_svg_lines([f"Error: {e}"], THEMES.get(selected_theme, THEMES['Default']))
+            svg_bytes = recent_activity_card._render_svg_lines([f"Error: {e}"], resolve_theme(selected_theme))
 
         b64 = base64.b64encode(svg_bytes.encode('utf-8')).decode("utf-8")
         st.markdown(f'<img src="data:image/svg+xml;base64,{b64}" style="max-width: 100%; box-shadow: 0 4px 6px rgba(0,0,0,0.3); border-radius: 10px;"/>', unsafe_allow_html=True)
@@ -0,0 +1,186 @@
+"""
+Micro-benchmarks for the SVG generators
+
+Renders every card over synthetic profiles from 0 to 10 years of
+contribution days and 1 to 5,000 repos, and reports per-render time, peak
+traced allocation and output size (plain and through the compact
+optimizer, generators/svg_optimizer.py; a case fails if the compact output
+loses an animation). Results are saved as JSON so runs can be
+compared across commits:
+
+    python -m benchmarks.bench_generators --out before.json
+    (change something)
+    python -m benchmarks.bench_generators --out after.json --compare before.json
+
+or across SVG backends (generators/svg_template.py):
+
+    python -m benchmarks.bench_generators --backend svgwrite --out svgwrite.json
+    python -m benchmarks.bench_generators --backend template --compare svgwrite.json
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_activity_lines, synthetic_profile
+from generators import contrib_card, lang_card, stats_card
+from generators.recent_activity_card import _render_svg_lines
+from generators.svg_optimizer import count_animations, optimize_svg
+from generators.svg_template import BACKENDS, SVG_BACKEND
+from themes import gaming, marvel, music, neural, space
+from themes.styles import THEMES
+
+DAY_SIZES = (0, 30, 365, 3650)
+REPO_SIZES = (1, 100, 5000)
+LINE_COUNTS = (0, 3, 50)
+# Neural art places one neuron per contribution day
+NEURAL_NODE_COUNTS = (80, 365, 3650)
+ART = {"space": space, "gaming": gaming, "music": music, "marvel": marvel, "neural": neural}
+
+
+def cases(themes=tuple(THEMES), backend=None):
+    """(name, params, render) for every benchmarked combination; `backend` applies to the cards, not the art."""
+    profiles = {}
+
+    def profile(days, repos):
+        if (days, repos) not in profiles:
+            profiles[(days, repos)] = synthetic_profile(days=days, repos=repos)
+        return profiles[(days, repos)]
+
+    for theme in themes:
+        for repos in REPO_SIZES:
+            data = profile(365, repos)
+            yield "stats", {"theme": theme, "repos": repos}, lambda d=data, t=theme: stats_card.draw_stats_card(d, t, backend=backend)
+            yield "languages", {"theme": theme, "repos": repos}, lambda d=data, t=theme: lang_card.draw_lang_card(d, t, backend=backend)
+        for days in DAY_SIZES:
+            data = profile(days, 30)
+            yield "contributions", {"theme": theme, "days": days}, lambda d=data, t=theme: contrib_card.draw_contrib_card(d, t, backend=backend)
+        for count in LINE_COUNTS:
+            lines = synthetic_activity_lines(count)
+            yield "recent_lines", {"theme": theme, "lines": count}, lambda l=lines, t=theme: _render_svg_lines(l, THEMES[t], backend)
+    for name, module in ART.items():
+        for days in NEURAL_NODE_COUNTS if name == "neural" else DAY_SIZES:
+            data = profile(days, 30)
+            yield f"art_{name}", {"days": days}, lambda d=data, m=module: m.render(d)
+
+
+def measure(render, repeat, min_time):
+    """Per-render timings (seconds), peak traced bytes and the output of one case."""
+    output = render()  # warm-up, and the output we size
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < repeat or (time.perf_counter() < deadline and len(times) < repeat * 10):
+        start = time.perf_counter()
+        render()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        render()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return times, peak, output
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_id(result):
+    params = ",".join(f"{k}={result[k]}" for k in ("theme", "days", "repos", "lines") if k in result)
+    return f"{result['name']}[{params}]"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GitCanvas SVG generators.")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--repeat", type=int, default=10, help="minimum timed renders per case (default: 10)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per case (default: 0.2)")
+    parser.add_argument("--themes", default=",".join(THEMES), help="comma-separated THEMES keys (default: all)")
+    parser.add_argument("--backend", choices=BACKENDS, default=SVG_BACKEND,
+                        help=f"SVG backend for the cards (default: {SVG_BACKEND})")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this string")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, params, render in cases([t for t in args.themes.split(",") if t], args.backend):
+        if args.filter not in name:
+            continue
+        result = {"name": name, **params}
+        try:
+            times, peak, output = measure(render, args.repeat, args.min_time)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            print(f"{case_id(result):<48} ERROR {result['error']}")
+            results.append(result)
+            continue
+        # The optimizer must not drop anything that changes the rendering
+        compact = optimize_svg(output)
+        animations, kept = count_animations(output), count_animations(compact)
+        if kept != animations:
+            result["error"] = f"compact output keeps {kept} of {animations} animations"
+            print(f"{case_id(result):<48} ERROR {result['error']}")
+            results.append(result)
+            continue
+        result.update({
+            "runs": len(times),
+            "mean_ms": statistics.fmean(times) * 1000,
+            "median_ms": statistics.median(times) * 1000,
+            "min_ms": min(times) * 1000,
+            "peak_alloc_bytes": peak,
+            "output_bytes": len(output.encode("utf-8")),
+            "compact_bytes": len(compact.encode("utf-8")),
+        })
+        results.append(result)
+        print(f"{case_id(result):<48} {result['median_ms']:9.3f} ms  {peak / 1024:9.1f} KiB peak  "
+              f"{result['output_bytes']:9d} B out  {result['compact_bytes']:9d} B compact")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        label = before["meta"].get("commit") or args.compare
+        if before["meta"].get("backend", "svgwrite") != args.backend:
+            label += f", {before['meta'].get('backend', 'svgwrite')} backend"
+        print(f"\nCompared with {label} (median time, output bytes):")
+        previous = {case_id(r): r for r in before["results"] if "error" not in r}
+        for result in results:
+            old = previous.get(case_id(result))
+            if old is None or "error" in result:
+                continue
+            speedup = old["median_ms"] / result["median_ms"] if result["median_ms"] else float("inf")
+            print(f"{case_id(result):<48} {old['median_ms']:9.3f} -> {result['median_ms']:9.3f} ms ({speedup:5.2f}x)"
+                  f"  {old['output_bytes']:8d} -> {result['output_bytes']:8d} B")
+
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
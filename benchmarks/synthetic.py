@@ -0,0 +1,72 @@
+"""
+Deterministic synthetic profiles for benchmarks
+
+Shaped like the dicts returned by utils.github_api, with the repo-derived
+fields computed through RepoStats so they match what a real fetch produces.
+"""
+
+import datetime
+import random
+
+from utils.contributions import ContributionCalendar
+from utils.github_api import RepoStats
+
+LANGUAGES = [
+    "Python", "JavaScript", "TypeScript", "Rust", "Go", "Java", "C", "C++", "C#", "Ruby",
+    "PHP", "Kotlin", "Swift", "Shell", "HTML", "CSS", "Lua", "Haskell", "Scala", "Elixir",
+]
+
+# Fixed end date so output bytes are comparable between runs
+END_DATE = datetime.date(2025, 12, 31)
+
+
+def synthetic_repos(count, seed=0):
+    """REST-shaped repo objects with a skewed language mix and star counts."""
+    rng = random.Random(seed)
+    weights = [1 / (i + 1) for i in range(len(LANGUAGES))]
+    return [
+        {
+            "stargazers_count": int(rng.paretovariate(1.5)) - 1,
+            "language": rng.choices(LANGUAGES, weights)[0] if rng.random() > 0.1 else None,
+        }
+        for _ in range(count)
+    ]
+
+
+def synthetic_contributions(days, seed=0):
+    """`days` calendar days ending at END_DATE, weekdays busier than weekends."""
+    rng = random.Random(seed)
+    start = END_DATE - datetime.timedelta(days=days - 1)
+    out = []
+    for i in range(days):
+        day = start + datetime.timedelta(days=i)
+        busy = 0.75 if day.weekday() < 5 else 0.3
+        count = int(rng.expovariate(1 / 6)) if rng.random() < busy else 0
+        out.append({"date": day.isoformat(), "count": count})
+    return out
+
+
+def synthetic_profile(username="bench-user", days=365, repos=30, seed=0):
+    stats = RepoStats()
+    stats.add_page(synthetic_repos(repos, seed))
+    contributions = synthetic_contributions(days, seed)
+    return {
+        "username": username,
+        "total_stars": stats.total_stars,
+        "total_commits": sum(d["count"] for d in contributions),
+        "public_repos": repos,
+        "followers": repos * 3,
+        "top_languages": stats.top_languages(),
+        "contributions": ContributionCalendar.from_days(contributions),
+    }
+
+
+def synthetic_activity_lines(count, seed=0):
+    """Lines as draw_recent_activity_card builds them from PR/issue events."""
+    rng = random.Random(seed)
+    verbs = ["Opened PR", "Merged PR", "Closed PR", "Opened Issue", "Closed Issue"]
+    return [
+        f"{rng.choice(verbs)} #{rng.randint(1, 9999)} in org/repo{i}: "
+        + " ".join(rng.choice(["fix", "cache", "render", "theme", "svg", "api", "docs"]) for _ in range(rng.randint(2, 16)))
+        for i in range(count)
+    ]
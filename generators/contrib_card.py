@@ -1,23 +1,38 @@
-import svgwrite
-import random
-from themes.styles import THEMES
+from generators.svg_template import drawing
+from themes.resolve import resolve_theme
+from utils.timing import serialize
+from utils.rng import seeded_rng
+from utils.contributions import as_calendar
+from utils.spatial import nearest_edges
 import math
-def draw_contrib_card(data, theme_name="Default", custom_colors=None):
+
+# Days shown by the Default grid: 25 columns of 5
+GRID_COLUMNS = 25
+GRID_ROWS = 5
+
+
+def contribution_levels(counts):
+    """GitHub-style 0-4 level per day: 0 for no contributions, then quarters of the busiest day."""
+    busiest = max(counts, default=0)
+    return [0 if c == 0 else min(4, 1 + (4 * c - 1) // busiest) for c in counts]
+
+
+def draw_contrib_card(data, theme_name="Default", custom_colors=None, backend=None):
     """
     Generates the Contribution Graph Card SVG.
-    Supports 'Snake', 'Space', 'Marvel' visualization logic.
+    Supports 'Snake', 'Space', 'Marvel' visualization logic. Every theme is
+    drawn from the most recent days of data['contributions'] (so a from/to
+    range changes what it shows); randomness only places the decorations.
+    backend: "svgwrite" or "template" (see generators/svg_template.py)
     """
-    theme = THEMES.get(theme_name, THEMES["Default"]).copy()
-    if custom_colors:
-        theme.update(custom_colors)
-    
-    # Fake contribution data for visualization if not fully populated
-    # In a real scenario, data['contributions'] would have the last ~15-30 days or weeks
-    # For MVP we simulate a strip of activity
+    theme = resolve_theme(theme_name, custom_colors)
+    # Same user and contributions -> same layout, so the SVG and its ETag are stable
+    rng = seeded_rng(data)
+    calendar = as_calendar(data.get("contributions"))
     
     width = 500
     height = 150
-    dwg = svgwrite.Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    dwg = drawing(backend, size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
     
     # Background
     dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), rx=10, ry=10, 
@@ -44,10 +59,12 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
                          fill=theme["text_color"], font_family="Courier New", font_size=16, font_weight="bold"))
         
         # Draw Food (Contributions) randomly placed
-        # Red pixel apples
-        for i in range(8):
-             fx = random.randint(2, 28) * (grid_size+2) + start_x
-             fy = random.randint(1, 5) * (grid_size+2) + start_y
+        # Red pixel apples: one per active day of the last 30, at most 8
+        recent = calendar.last(30).counts
+        active = sum(1 for c in recent if c)
+        for i in range(min(active, 8)):
+             fx = rng.randint(2, 28) * (grid_size+2) + start_x
+             fy = rng.randint(1, 5) * (grid_size+2) + start_y
              if fy > height - 20: fy = height - 20
              dwg.add(dwg.rect(insert=(fx, fy), size=(grid_size, grid_size), fill="#FF3333", rx=2, ry=2)) # Apple
 
@@ -56,6 +73,8 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         segments = [(start_x + i*(grid_size+2), start_y + (grid_size+2)*2) for i in range(10)]
         # Turn
         segments.extend([(start_x + 9*(grid_size+2), start_y + (grid_size+2)*j) for j in range(3, 5)])
+        # The snake grows with the share of active days
+        segments = segments[:2 + round((len(segments) - 2) * active / max(len(recent), 1))]
         
         for px, py in segments:
             dwg.add(dwg.rect(insert=(px, py), size=(grid_size, grid_size), fill=theme["icon_color"], rx=2, ry=2))
@@ -82,11 +101,14 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
             }
             """))
 
-        for i in range(30):
-            sx = random.randint(20, width - 20)
-            sy = random.randint(50, height - 20)
-            r = random.uniform(1, 3)
-            delay = random.uniform(0, 2)
+        # One star per active day of the last 30, bigger for busier days
+        for level in contribution_levels(calendar.last(30).counts):
+            if not level:
+                continue
+            sx = rng.randint(20, width - 20)
+            sy = rng.randint(50, height - 20)
+            r = 1 + level * 0.5
+            delay = rng.uniform(0, 2)
 
             star = dwg.circle(
                 center=(sx, sy),
@@ -118,15 +140,20 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         cx = width / 2
         cy = height / 2 + 10
         
-        # Gauntlet hints? Or just the stones glowing
+        # One stone per sixth of the last 90 days; it glows if that stretch had contributions
+        recent = calendar.last(90)
+        period = max(1, -(-len(recent) // len(stones)))
         for i, color in enumerate(stones):
             sx = 60 + i * 60
             sy = cy
+            lit = any(recent.counts[i * period:(i + 1) * period])
             
             # Glow
-            dwg.add(dwg.circle(center=(sx, sy), r=15, fill=color, opacity=0.3))
+            if lit:
+                dwg.add(dwg.circle(center=(sx, sy), r=15, fill=color, opacity=0.3))
             # Stone
-            dwg.add(dwg.circle(center=(sx, sy), r=8, fill=color, stroke="white", stroke_width=1))
+            dwg.add(dwg.circle(center=(sx, sy), r=8, fill=color, stroke="white", stroke_width=1,
+                               opacity=1 if lit else 0.25))
             
             # Label below
             dwg.add(dwg.text(f"Stone {i+1}", insert=(sx, sy+30), fill="white", font_size=10, text_anchor="middle"))
@@ -137,9 +164,9 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         cx = width / 2
         cy = height / 2 + 10
 
-        contributions = data.get("contributions", [])[-80:]
+        contributions = calendar.last(80)
         if not contributions:
-            return dwg.tostring()
+            return serialize(dwg)
 
         nodes = []
 
@@ -156,19 +183,18 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         ))
 
         # --- Generate brain-shaped neuron positions ---
-        for i, day in enumerate(contributions):
-            count = day.get("count", 0)
+        for i, count in enumerate(contributions.counts):
 
             # Hemisphere split
             side = -1 if i % 2 == 0 else 1
 
             # Organic brain ellipse
-            angle = random.uniform(0, math.pi)
-            radius_x = random.uniform(90, 150)
-            radius_y = random.uniform(60, 110)
+            angle = rng.uniform(0, math.pi)
+            radius_x = rng.uniform(90, 150)
+            radius_y = rng.uniform(60, 110)
 
             # Distortion noise
-            noise = random.uniform(0.85, 1.15)
+            noise = rng.uniform(0.85, 1.15)
 
             x = cx + side * math.cos(angle) * radius_x * noise
             y = cy + math.sin(angle) * radius_y * noise
@@ -188,26 +214,20 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
             nodes.append((x, y, count))
 
         # --- Synapse connections ---
-        for i in range(len(nodes)):
+        # Each neuron connects to its few nearest neighbors within 140px
+        for i, j in nearest_edges([(x, y) for x, y, _ in nodes], 4, 140):
             x1, y1, c1 = nodes[i]
+            x2, y2, c2 = nodes[j]
 
-            # Each neuron connects to a few others
-            for _ in range(random.randint(2, 6)):
-                j = random.randint(0, len(nodes) - 1)
-                x2, y2, c2 = nodes[j]
-
-                dist = math.hypot(x2 - x1, y2 - y1)
+            opacity = min((c1 + c2) / 20, 0.5)
 
-                if dist < 140:
-                    opacity = min((c1 + c2) / 20, 0.5)
-
-                    dwg.add(dwg.line(
-                        start=(x1, y1),
-                        end=(x2, y2),
-                        stroke="#00f7ff",
-                        stroke_width=1,
-                        opacity=opacity
-                    ))
+            dwg.add(dwg.line(
+                start=(x1, y1),
+                end=(x2, y2),
+                stroke="#00f7ff",
+                stroke_width=1,
+                opacity=opacity
+            ))
 
 
     else:
@@ -218,15 +238,18 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
         start_x = 20
         start_y = 60
         
-        count = 0
-        for col in range(25): # 25 weeks horizontal
-            for row in range(5): # 5 days vertical
+        # The most recent days, oldest first, filling columns top to bottom;
+        # a calendar shorter than the grid leaves the leading cells empty
+        days = GRID_COLUMNS * GRID_ROWS
+        levels = contribution_levels(calendar.last(days).counts)
+        levels = [0] * (days - len(levels)) + levels
+        colors = ["#161b22", "#0e4429", "#006d32", "#26a641", "#39d353"]
+        for col in range(GRID_COLUMNS): # 25 weeks horizontal
+            for row in range(GRID_ROWS): # 5 days vertical
                 x = start_x + col * (box_size + gap)
                 y = start_y + row * (box_size + gap)
                 
-                # Random "green" level
-                level = random.choice([0, 1, 2, 3, 4])
-                colors = ["#161b22", "#0e4429", "#006d32", "#26a641", "#39d353"]
+                level = levels[col * GRID_ROWS + row]
                 
                 # Use theme override if set
                 # For default we stick to standard GH colors unless customized logic is deeper
@@ -239,4 +262,4 @@ def draw_contrib_card(data, theme_name="Default", custom_colors=None):
                      
                 dwg.add(dwg.rect(insert=(x, y), size=(box_size, box_size), fill=fill, rx=2, ry=2))
                 
-    return dwg.tostring()
+    return serialize(dwg)
@@ -1,8 +1,9 @@
-import svgwrite
+from generators.svg_template import drawing
 import math
-from themes.styles import THEMES
+from themes.resolve import resolve_theme
+from utils.timing import serialize
 
-def draw_lang_card(data, theme_name="Default", custom_colors=None, excluded_languages=None):
+def draw_lang_card(data, theme_name="Default", custom_colors=None, excluded_languages=None, backend=None):
     """
     Generates the Top Languages Card SVG.
     
@@ -11,10 +12,9 @@ def draw_lang_card(data, theme_name="Default", custom_colors=None, excluded_lang
         theme_name: string key from THEMES
         custom_colors: dict with custom color overrides
         excluded_languages: list of language names to exclude (case-insensitive)
+        backend: "svgwrite" or "template" (see generators/svg_template.py)
     """
-    theme = THEMES.get(theme_name, THEMES["Default"]).copy()
-    if custom_colors:
-        theme.update(custom_colors)
+    theme = resolve_theme(theme_name, custom_colors)
         
     width = 300
     # Dynamic height based on languages (max 5)
@@ -38,7 +38,7 @@ def draw_lang_card(data, theme_name="Default", custom_colors=None, excluded_lang
     header_height = 40
     height = header_height + (len(langs) * item_height) + 10
     
-    dwg = svgwrite.Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    dwg = drawing(backend, size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
     
     # Background
     dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), rx=10, ry=10, 
@@ -100,4 +100,4 @@ def draw_lang_card(data, theme_name="Default", custom_colors=None, excluded_lang
         
         dwg.add(progress_fill)
         
-    return dwg.tostring()
\ No newline at end of file
+    return serialize(dwg)
\ No newline at end of file
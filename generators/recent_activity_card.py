@@ -1,94 +1,63 @@
-import svgwrite
-import requests
-from themes.styles import THEMES
+from generators.svg_template import drawing
+from themes.resolve import resolve_theme
+from utils.timing import serialize
 
 
-def draw_recent_activity_card(data, theme_name="Default", custom_colors=None, token=None):
-    """
-    Fetches the user's GitHub events and renders a simple text-based SVG
-    showing the last 3 Pull Request or Issue events.
-
-    Params:
-      data: dict with at least 'username'
-      theme_name: theme key from THEMES
-      custom_colors: dict to override theme values
-      token: optional GitHub token string for higher rate limit
-
-    Returns: SVG string
-    """
-    username = data.get('username')
-    if not username:
-        raise ValueError("data must include 'username'")
-
-    theme = THEMES.get(theme_name, THEMES["Default"]).copy()
-    if custom_colors:
-        theme.update(custom_colors)
-
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if token:
-        headers["Authorization"] = f"token {token}"
-
-    url = f"https://api.github.com/users/{username}/events"
-    try:
-        resp = requests.get(url, headers=headers, timeout=8)
-    except Exception as e:
-        # Return an SVG with the error
-        return _render_svg_lines([f"Error fetching events: {e}"], theme)
-
-    if resp.status_code != 200:
-        return _render_svg_lines([f"GitHub API error: {resp.status_code}"], theme)
-
-    events = resp.json()
-
+def activity_lines(activity, limit=3):
+    """Human-readable lines for the newest `limit` PR/issue activity items."""
     lines = []
-    for ev in events:
-        if ev.get('type') == 'PullRequestEvent':
-            payload = ev.get('payload', {})
-            action = payload.get('action')
-            pr = payload.get('pull_request', {})
-            number = pr.get('number')
-            title = pr.get('title') or ''
-            repo = ev.get('repo', {}).get('name', '')
-            merged = pr.get('merged')
-
-            if merged:
+    for item in activity[:limit]:
+        number, repo, title, action = item.get("number"), item.get("repo", ""), item.get("title", ""), item.get("action")
+        if item.get("kind") == "pr":
+            if item.get("merged"):
                 lines.append(f"Merged PR #{number} in {repo}: {title}")
+            elif action == 'opened':
+                lines.append(f"Opened PR #{number} in {repo}: {title}")
+            elif action == 'closed':
+                lines.append(f"Closed PR #{number} in {repo}: {title}")
             else:
-                if action == 'opened':
-                    lines.append(f"Opened PR #{number} in {repo}: {title}")
-                elif action == 'closed':
-                    lines.append(f"Closed PR #{number} in {repo}: {title}")
-                else:
-                    lines.append(f"PR #{number} {action} in {repo}: {title}")
-
-        elif ev.get('type') == 'IssuesEvent':
-            payload = ev.get('payload', {})
-            action = payload.get('action')
-            issue = payload.get('issue', {})
-            number = issue.get('number')
-            title = issue.get('title') or ''
-            repo = ev.get('repo', {}).get('name', '')
-
+                lines.append(f"PR #{number} {action} in {repo}: {title}")
+        else:
             if action == 'opened':
                 lines.append(f"Opened Issue #{number} in {repo}: {title}")
             elif action == 'closed':
                 lines.append(f"Closed Issue #{number} in {repo}: {title}")
             else:
                 lines.append(f"Issue #{number} {action} in {repo}: {title}")
+    return lines
+
+
+def draw_recent_activity_card(data, theme_name="Default", custom_colors=None, backend=None):
+    """
+    Renders a simple text-based SVG showing the last 3 Pull Request or
+    Issue events. Pure function of the data; fetching is done by
+    utils.github_api.get_recent_activity.
+
+    Params:
+      data: activity feed from github_api.get_recent_activity(_async):
+            {'username', 'activity': [...], 'error': message or None}
+      theme_name: theme key from THEMES
+      custom_colors: dict to override theme values
+      backend: "svgwrite" or "template" (see generators/svg_template.py)
+
+    Returns: SVG string
+    """
+    theme = resolve_theme(theme_name, custom_colors)
 
-        if len(lines) >= 3:
-            break
+    if data.get('error'):
+        return _render_svg_lines([data['error']], theme, backend)
 
+    lines = activity_lines(data.get('activity') or [])
     if not lines:
         lines = ["No recent PRs or Issues found."]
 
-    return _render_svg_lines(lines[:3], theme)
+    return _render_svg_lines(lines, theme, backend)
 
 
-def _render_svg_lines(lines, theme):
+def _render_svg_lines(lines, theme, backend=None):
     width = 520
     height = 120
-    dwg = svgwrite.Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    dwg = drawing(backend, size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
 
     dwg.add(dwg.rect(insert=(0, 0), size=(width, height), rx=8, ry=8,
                      fill=theme["bg_color"], stroke=theme["border_color"], stroke_width=2))
@@ -106,4 +75,4 @@ def _render_svg_lines(lines, theme):
                          fill=theme["text_color"], font_size=theme.get("text_font_size", 14),
                          font_family=theme.get("font_family", "sans-serif")))
 
-    return dwg.tostring()
+    return serialize(dwg)
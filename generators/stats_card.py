@@ -1,19 +1,19 @@
-import svgwrite
-from themes.styles import THEMES
+from generators.svg_template import drawing
+from themes.resolve import resolve_theme
+from utils.timing import serialize
 
-def draw_stats_card(data, theme_name="Default", show_options=None, custom_colors=None):
+def draw_stats_card(data, theme_name="Default", show_options=None, custom_colors=None, backend=None):
     """
     Generates the Main Stats Card SVG.
     data: dict with user stats
     theme_name: string key from THEMES
     show_options: dict with toggles (e.g. {'stars': True, 'prs': False})
+    backend: "svgwrite" or "template" (see generators/svg_template.py)
     """
     if show_options is None:
         show_options = {"stars": True, "commits": True, "repos": True, "followers": True}
         
-    theme = THEMES.get(theme_name, THEMES["Default"]).copy()
-    if custom_colors:
-        theme.update(custom_colors)
+    theme = resolve_theme(theme_name, custom_colors)
 
     
     width = 450
@@ -23,7 +23,7 @@ def draw_stats_card(data, theme_name="Default", show_options=None, custom_colors
     visible_items = sum(1 for k, v in show_options.items() if v)
     height = base_height + (visible_items * item_height) + 10
     
-    dwg = svgwrite.Drawing(size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
+    dwg = drawing(backend, size=("100%", "100%"), viewBox=f"0 0 {width} {height}")
     
     # Add minimal CSS animations
     style = dwg.defs.add(dwg.style("""
@@ -98,4 +98,4 @@ def draw_stats_card(data, theme_name="Default", show_options=None, custom_colors
                              
             current_y += item_height
             
-    return dwg.tostring()
\ No newline at end of file
+    return serialize(dwg)
\ No newline at end of file
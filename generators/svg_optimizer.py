@@ -0,0 +1,204 @@
+"""
+Compact SVG output: a post-processing pass over a generator's SVG text
+
+- numbers are rounded to `precision` decimals and written without
+  redundant zeros; whitespace in styles is stripped
+- shapes repeated with the same geometry (rects, circles) are defined once
+  in <defs> and placed with <use xlink:href x y>; shapes with children (animations)
+  are left alone
+- repeated sets of presentation attributes (fill, stroke, font, ...) become
+  CSS classes in a single <style> block, with "px" added to bare font sizes
+- svgwrite's optional baseProfile/version attributes, unused namespace
+  declarations and empty <defs> are dropped
+
+The rendering is unchanged apart from the rounding.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter, defaultdict
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+ET.register_namespace("ev", "http://www.w3.org/2001/xml-events")
+
+_NUMBER = re.compile(r"-?\d*\.\d+(?:[eE][-+]?\d+)?")
+_BARE_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)")
+
+# Attributes that may be moved into a CSS rule without changing the cascade
+# (a class rule outranks a presentation attribute, but nothing else sets these)
+PRESENTATION = (
+    "fill", "fill-opacity", "stroke", "stroke-width", "stroke-dasharray", "stroke-opacity",
+    "opacity", "font-family", "font-size", "font-weight", "text-anchor",
+)
+
+# Shape tag -> (geometry attributes kept on the shared definition, position attributes put on <use>)
+REUSABLE = {
+    "rect": (("width", "height", "rx", "ry"), ("x", "y")),
+    "circle": (("r",), ("cx", "cy")),
+}
+
+# SMIL elements: their attributes (fill="freeze", values, ...) are not CSS properties
+ANIMATIONS = ("animate", "animateColor", "animateMotion", "animateTransform", "set")
+
+# Presentation attributes that are lengths: a bare number is user units (px) as an
+# attribute but invalid in a stylesheet, so the rule gets an explicit unit
+LENGTHS = ("font-size",)
+
+# Only worth a <defs> entry / CSS rule when repeated at least this often
+MIN_REPEATS = 3
+
+
+def _tag(element) -> str:
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _shorten_number(match, precision):
+    value = round(float(match.group(0)), precision)
+    if value == int(value):
+        return str(int(value))
+    text = f"{value:.{precision}f}".rstrip("0")
+    # ".5" and "-.5" are valid SVG/CSS numbers
+    return text.replace("0.", ".", 1) if text.startswith(("0.", "-0.")) else text
+
+
+def _shorten(value: str, precision: int) -> str:
+    return _NUMBER.sub(lambda m: _shorten_number(m, precision), value)
+
+
+def _minify_css(css: str) -> str:
+    css = re.sub(r"\s+", " ", css).strip()
+    return re.sub(r"\s*([{}:;,])\s*", r"\1", css).replace(";}", "}")
+
+
+def _attr_size(attrs) -> int:
+    return sum(len(name) + len(value) + 4 for name, value in attrs)
+
+
+def _css_value(name: str, value: str) -> str:
+    if name in LENGTHS and _BARE_NUMBER.fullmatch(value):
+        return value + "px"
+    return value
+
+
+def count_animations(svg: str) -> int:
+    """Number of SMIL animation elements in `svg`."""
+    return sum(1 for element in ET.fromstring(svg).iter() if _tag(element) in ANIMATIONS)
+
+
+def _reuse_shapes(root, defs):
+    """Replace runs of identically shaped rects/circles with <use> of one definition."""
+    groups = defaultdict(list)
+    for parent in root.iter():
+        if _tag(parent) in ("defs", "symbol", "clipPath", "mask", "pattern", "marker"):
+            continue
+        for child in parent:
+            tag = _tag(child)
+            # Children (e.g. an <animate> of the width) can't move onto a <use>
+            if tag not in REUSABLE or len(child) or child.get("id") or child.get("transform"):
+                continue
+            geometry, _ = REUSABLE[tag]
+            shape = tuple((name, child.get(name)) for name in geometry if child.get(name) is not None)
+            groups[(tag, shape)].append((parent, child))
+
+    count = 0
+    for (tag, shape), members in groups.items():
+        if len(members) < MIN_REPEATS or not shape:
+            continue
+        shape_id = f"s{count}"
+        count += 1
+        ET.SubElement(defs, f"{{{SVG_NS}}}{tag}", dict(shape, id=shape_id))
+        _, position = REUSABLE[tag]
+        for parent, child in members:
+            attrs = {k: v for k, v in child.attrib.items() if k not in dict(shape)}
+            # xlink:href, not SVG 2's bare href: SVG 1.1 renderers (older librsvg and Safari,
+            # image proxies) ignore the latter and drop the shape
+            use_attrs = {f"{{{XLINK_NS}}}href": f"#{shape_id}"}
+            for name, use_name in zip(position, ("x", "y")):
+                value = attrs.pop(name, None)
+                if value not in (None, "0"):
+                    use_attrs[use_name] = value
+            use_attrs.update(attrs)
+            use = ET.Element(f"{{{SVG_NS}}}use", use_attrs)
+            use.tail = child.tail
+            parent[list(parent).index(child)] = use
+
+
+def _classify(root, styles):
+    """Move repeated presentation-attribute sets into CSS classes."""
+    candidates = []
+    for element in root.iter():
+        tag = _tag(element)
+        if element.get("class") or element.get("style") or tag in ("svg", "style", "defs") or tag in ANIMATIONS:
+            continue
+        attrs = tuple(sorted((k, v) for k, v in element.attrib.items() if k in PRESENTATION))
+        if attrs:
+            candidates.append((element, attrs))
+
+    counts = Counter(attrs for _, attrs in candidates)
+    names = {}
+    for attrs, n in counts.most_common():
+        name = f"c{len(names)}"
+        rule = f".{name}{{" + ";".join(f"{k}:{_css_value(k, v)}" for k, v in attrs) + "}"
+        # Bytes saved per element minus the cost of the rule
+        if n < 2 or n * (_attr_size(attrs) - len(name) - 9) <= len(rule):
+            continue
+        names[attrs] = name
+        styles.append(rule)
+
+    for element, attrs in candidates:
+        name = names.get(attrs)
+        if name is None:
+            continue
+        for key, _ in attrs:
+            del element.attrib[key]
+        element.set("class", name)
+
+
+def optimize_svg(svg: str, precision: int = 2) -> str:
+    """Return a smaller, equivalent rendering of `svg` (the text svgwrite produces)."""
+    root = ET.fromstring(svg)
+    for attr in ("baseProfile", "version"):
+        root.attrib.pop(attr, None)
+
+    for element in root.iter():
+        for key, value in element.attrib.items():
+            if key == "style":
+                value = _minify_css(value)
+            if key != "id" and key != "class":
+                element.set(key, _shorten(value, precision))
+
+    # Collect existing <style> text into one block; it is re-added at the end
+    styles = []
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if _tag(child) == "style":
+                styles.append(_minify_css(_shorten(child.text or "", precision)))
+                parent.remove(child)
+
+    defs = root.find(f"{{{SVG_NS}}}defs")
+    if defs is None:
+        defs = ET.Element(f"{{{SVG_NS}}}defs")
+        root.insert(0, defs)
+
+    _reuse_shapes(root, defs)
+    _classify(root, styles)
+
+    if styles:
+        style = ET.Element(f"{{{SVG_NS}}}style")
+        style.text = "".join(styles)
+        defs.insert(0, style)
+    if len(defs) == 0:
+        root.remove(defs)
+
+    # x/y default to 0
+    for element in root.iter():
+        if _tag(element) in ("rect", "use", "text"):
+            for attr in ("x", "y"):
+                if element.get(attr) == "0":
+                    del element.attrib[attr]
+
+    # " />" only occurs in tags: attribute values and text escape ">"
+    return ET.tostring(root, encoding="unicode", short_empty_elements=True).replace(" />", "/>")
@@ -0,0 +1,179 @@
+"""
+Template-based SVG backend for the card generators
+
+A drop-in for the part of svgwrite the cards use: Drawing (defs, add,
+tostring) and its rect, circle, line, path, text, style and animate
+factories. svgwrite validates every attribute as it is set and serializes
+through an ElementTree; here elements only hold their attributes and are
+written straight to text. Each distinct (tag, attribute names) pair is
+compiled once into a format string, so writing an element is a single
+str.format call with XML-escaped values.
+
+The output is byte-for-byte what svgwrite produces for the same calls
+(sorted attributes, empty values dropped, CDATA styles, " />" empty tags).
+
+Select it per call with backend="template" on the draw_* functions, or for
+the whole process with GITCANVAS_SVG_BACKEND=template.
+"""
+
+import os
+from functools import lru_cache
+
+import svgwrite
+
+BACKENDS = ("svgwrite", "template")
+SVG_BACKEND = os.getenv("GITCANVAS_SVG_BACKEND", "svgwrite")
+
+# Same escaping as ElementTree's serializer
+_ATTR_ESCAPES = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+    "\r": "&#13;", "\n": "&#10;", "\t": "&#09;",
+})
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+@lru_cache(maxsize=None)
+def _template(tag, names):
+    """'<tag a="{}" b="{}"' for attribute names already in output order."""
+    return "<" + tag + "".join(f' {name}="{{}}"' for name in names)
+
+
+class Element:
+    """An SVG element: tag, attributes, optional text and child elements."""
+
+    __slots__ = ("tag", "attribs", "elements", "body")
+
+    def __init__(self, tag, text=None, **extra):
+        self.tag = tag
+        self.body = text
+        self.elements = []
+        self.attribs = {}
+        self.update(extra)
+
+    def update(self, attribs):
+        """svgwrite's keyword rules: 'class_' -> 'class', 'stroke_width' -> 'stroke-width'."""
+        for key, value in attribs.items():
+            self.attribs[key.rstrip("_").replace("_", "-")] = value
+
+    def __getitem__(self, key):
+        return self.attribs[key]
+
+    def __setitem__(self, key, value):
+        self.attribs[key] = value
+
+    def add(self, element):
+        self.elements.append(element)
+        return element
+
+    def content(self):
+        """Escaped text content ("" for none)."""
+        return str(self.body).translate(_TEXT_ESCAPES) if self.body else ""
+
+    def write(self, out):
+        """Append this element's markup to the list `out`."""
+        names, values = [], []
+        for name, value in sorted(self.attribs.items()):
+            if value is None:
+                continue
+            value = str(value)
+            if value:
+                names.append(name)
+                values.append(value.translate(_ATTR_ESCAPES))
+        out.append(_template(self.tag, tuple(names)).format(*values))
+        content = self.content()
+        if content or self.elements:
+            out.append(">")
+            out.append(content)
+            for element in self.elements:
+                element.write(out)
+            out.append(f"</{self.tag}>")
+        else:
+            out.append(" />")
+
+    def tostring(self):
+        out = []
+        self.write(out)
+        return "".join(out)
+
+
+class Style(Element):
+    __slots__ = ()
+
+    def __init__(self, content=""):
+        super().__init__("style", text=content, type="text/css")
+
+    def content(self):
+        return f"<![CDATA[{self.body}]]>" if self.body else ""
+
+
+class Drawing(Element):
+    """The svgwrite.Drawing subset used by the card generators."""
+
+    __slots__ = ("defs",)
+
+    def __init__(self, size=("100%", "100%"), **extra):
+        super().__init__("svg", **extra)
+        self.attribs["width"], self.attribs["height"] = size
+        self.attribs.update({
+            "baseProfile": "full",
+            "version": "1.1",
+            "xmlns": "http://www.w3.org/2000/svg",
+            "xmlns:xlink": "http://www.w3.org/1999/xlink",
+            "xmlns:ev": "http://www.w3.org/2001/xml-events",
+        })
+        self.defs = self.add(Element("defs"))
+
+    def rect(self, insert=(0, 0), size=(1, 1), rx=None, ry=None, **extra):
+        element = Element("rect", **extra)
+        element["x"], element["y"] = insert
+        element["width"], element["height"] = size
+        if rx is not None:
+            element["rx"] = rx
+        if ry is not None:
+            element["ry"] = ry
+        return element
+
+    def circle(self, center=(0, 0), r=1, **extra):
+        element = Element("circle", **extra)
+        element["cx"], element["cy"] = center
+        element["r"] = r
+        return element
+
+    def line(self, start=(0, 0), end=(0, 0), **extra):
+        element = Element("line", **extra)
+        element["x1"], element["y1"] = start
+        element["x2"], element["y2"] = end
+        return element
+
+    def path(self, d=None, **extra):
+        element = Element("path", **extra)
+        if d is not None:
+            element["d"] = d if isinstance(d, str) else " ".join(str(c) for c in d)
+        return element
+
+    def text(self, text, insert=None, **extra):
+        element = Element("text", text=text, **extra)
+        if insert is not None:
+            element["x"], element["y"] = insert
+        return element
+
+    def style(self, content=""):
+        return Style(content)
+
+    def animate(self, attributeName=None, values=None, **extra):
+        element = Element("animate", **extra)
+        if attributeName is not None:
+            element["attributeName"] = attributeName
+        if values is not None:
+            element["values"] = values if isinstance(values, str) else ";".join(str(v) for v in values)
+        return element
+
+
+def drawing(backend=None, **kwargs):
+    """A new Drawing from `backend` ("svgwrite" or "template"; default GITCANVAS_SVG_BACKEND)."""
+    backend = backend or SVG_BACKEND
+    if backend == "template":
+        return Drawing(**kwargs)
+    if backend == "svgwrite":
+        return svgwrite.Drawing(**kwargs)
+    raise ValueError(f"Unknown SVG backend: {backend} (expected one of {', '.join(BACKENDS)})")
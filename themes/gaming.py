@@ -1,4 +1,5 @@
 import svgwrite
+from utils.contributions import as_calendar
 
 def render(data):
     """
@@ -7,7 +8,7 @@ def render(data):
     High commit days are 'Castles'.
     """
     # We will accept up to 365 days (last year)
-    contributions = data['contributions'][-365:] if len(data['contributions']) > 365 else data['contributions']
+    contributions = as_calendar(data['contributions']).last(365).counts
     
     # Grid layout: 53 columns x 7 rows
     cols = 53
@@ -27,8 +28,7 @@ def render(data):
     start_x = 10
     start_y = 10
     
-    for i, day in enumerate(contributions):
-        msg_count = day['count']
+    for i, msg_count in enumerate(contributions):
         
         col = i // 7
         row = i % 7
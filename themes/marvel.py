@@ -1,4 +1,5 @@
 import svgwrite
+from utils.contributions import as_calendar
 
 def render(data):
     """
@@ -46,13 +47,13 @@ def render(data):
     # Commits as "Energy Cells" around the reactor ?? 
     # Let's add some orbiting particles based on recent contributions
     # Just a few
-    commits = [d for d in data['contributions'][-20:] if d['count'] > 0]
+    commits = [count for count in as_calendar(data['contributions']).last(20).counts if count > 0]
     import math
     for i, com in enumerate(commits):
         angle = i * (360 / 20)
         rad = math.radians(angle)
         
-        dist = 100 + com['count'] * 2
+        dist = 100 + com * 2
         
         px = cx + math.cos(rad) * dist
         py = cy + math.sin(rad) * dist
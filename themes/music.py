@@ -1,4 +1,5 @@
 import svgwrite
+from utils.contributions import as_calendar
 
 def render(data):
     """
@@ -6,7 +7,7 @@ def render(data):
     Logic: Commit frequency determines the 'amplitude' of the bars.
     """
     # Take last 100 days for a nice waveform look
-    contributions = data['contributions'][-100:] if len(data['contributions']) > 0 else []
+    contributions = as_calendar(data['contributions']).last(100).counts
     
     width = 800
     height = 400
@@ -28,13 +29,12 @@ def render(data):
     max_amp = height / 2 - 20
     
     # Calculate max commit to normalize
-    max_commits = max(d['count'] for d in contributions) if contributions else 1
+    max_commits = max(contributions) if contributions else 1
     if max_commits == 0: max_commits = 1
     
     start_x = 20
     
-    for i, day in enumerate(contributions):
-        count = day['count']
+    for i, count in enumerate(contributions):
         
         # Amplitude
         # Add a baseline so even 0 commits show a line
@@ -1,14 +1,22 @@
-import svgwrite
 import math
-import random
+from generators.svg_template import drawing
+from utils.rng import seeded_rng
+from utils.contributions import as_calendar
+from utils.spatial import nearest_edges
+
+# Only nearby neurons connect, each to at most this many of its nearest neighbors
+SYNAPSE_RADIUS = 120
+SYNAPSES_PER_NEURON = 6
 
 def render(data):
+    rng = seeded_rng(data)
     username = data['username']
-    contributions = data['contributions'][-80:]  # recent activity
+    contributions = as_calendar(data['contributions']).counts
 
     width = 900
     height = 500
-    dwg = svgwrite.Drawing(size=(f"{width}px", f"{height}px"))
+    # Thousands of neurons and synapses: honor GITCANVAS_SVG_BACKEND like the cards do
+    dwg = drawing(size=(f"{width}px", f"{height}px"))
 
     # Background
     dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), fill="#0a0f1f"))
@@ -25,14 +33,13 @@ def render(data):
     nodes = []
 
     # Create neurons in circular brain-like layout
-    for i, day in enumerate(contributions):
+    for i, count in enumerate(contributions):
         angle = i * (360 / len(contributions))
-        radius = 120 + random.randint(-40, 40)
+        radius = 120 + rng.randint(-40, 40)
 
         x = cx + math.cos(math.radians(angle)) * radius
         y = cy + math.sin(math.radians(angle)) * radius
 
-        count = day['count']
         size = 4 + min(count, 10)
 
         brightness = min(255, 100 + count * 15)
@@ -42,23 +49,18 @@ def render(data):
         dwg.add(dwg.circle(center=(x, y), r=size, fill=color, opacity=0.9))
         nodes.append((x, y, count))
 
-    # Draw synapse connections
-    for i in range(len(nodes)):
-        for j in range(i+1, len(nodes)):
-            x1, y1, c1 = nodes[i]
-            x2, y2, c2 = nodes[j]
-
-            dist = math.hypot(x2-x1, y2-y1)
+    # Draw synapse connections: each neuron to its nearest neighbors within SYNAPSE_RADIUS
+    for i, j in nearest_edges([(x, y) for x, y, _ in nodes], SYNAPSES_PER_NEURON, SYNAPSE_RADIUS):
+        x1, y1, c1 = nodes[i]
+        x2, y2, c2 = nodes[j]
 
-            # only connect nearby neurons
-            if dist < 120:
-                strength = min(c1 + c2, 15)
-                opacity = strength / 30
+        strength = min(c1 + c2, 15)
+        opacity = strength / 30
 
-                dwg.add(dwg.line(start=(x1, y1), end=(x2, y2),
-                                 stroke="#00f7ff",
-                                 stroke_width=1,
-                                 opacity=opacity))
+        dwg.add(dwg.line(start=(x1, y1), end=(x2, y2),
+                         stroke="#00f7ff",
+                         stroke_width=1,
+                         opacity=opacity))
 
     # Central Brain Core
     dwg.add(dwg.circle(center=(cx, cy), r=30, fill="#00f7ff", opacity=0.2))
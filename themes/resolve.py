@@ -0,0 +1,72 @@
+"""
+Resolved themes: a THEMES entry with validated custom color overrides
+
+resolve_theme() replaces the `THEMES.get(...).copy(); theme.update(custom_colors)`
+each generator used to do per render. Overrides are normalized once
+('FFF', '#fff' and ' #FFF ' are the same color), and the merged theme is a
+read-only mapping memoized by (theme, overrides) in a bounded LRU, so equal
+requests share one object.
+"""
+
+import os
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from themes.styles import THEMES
+
+THEME_CACHE_SIZE = int(os.getenv("GITCANVAS_THEME_CACHE_SIZE", "1024"))
+
+# Overrides the API and the Streamlit app expose
+COLOR_KEYS = ("bg_color", "title_color", "text_color", "border_color")
+
+# #rgb, #rgba, #rrggbb and #rrggbbaa
+_HEX = re.compile(r"[0-9a-f]{3,4}|[0-9a-f]{6}|[0-9a-f]{8}")
+
+
+def normalize_color(value: str) -> str:
+    """'FFF', '#fff' and ' #FFF ' all normalize to '#fff'; anything but hex raises ValueError."""
+    color = str(value).strip().lstrip("#").lower()
+    if not _HEX.fullmatch(color):
+        raise ValueError(f"Invalid color: {value!r} (expected hex like #58a6ff)")
+    return "#" + color
+
+
+def normalize_overrides(custom_colors: Optional[Mapping[str, str]]) -> Tuple[Tuple[str, str], ...]:
+    """Sorted ((key, '#hex'), ...) for a custom color dict; empty values are ignored."""
+    if not custom_colors:
+        return ()
+    overrides = {}
+    for key, value in custom_colors.items():
+        if not key.endswith("_color"):
+            raise ValueError(f"Unknown color override: {key}")
+        if value:
+            overrides[key] = normalize_color(value)
+    return tuple(sorted(overrides.items()))
+
+
+@lru_cache(maxsize=THEME_CACHE_SIZE)
+def _resolved(theme_name: str, overrides: Tuple[Tuple[str, str], ...]) -> Mapping:
+    return MappingProxyType({**THEMES[theme_name], **dict(overrides)})
+
+
+@lru_cache(maxsize=THEME_CACHE_SIZE)
+def _resolve(theme_name: str, raw: Tuple[Tuple[str, str], ...]) -> Mapping:
+    # Keyed by the overrides as given; differently spelled equal colors share one _resolved entry
+    name = theme_name if theme_name in THEMES else "Default"
+    return _resolved(name, normalize_overrides(dict(raw)))
+
+
+def resolve_theme(theme_name: str = "Default", custom_colors: Optional[Mapping[str, str]] = None) -> Mapping:
+    """
+    Read-only theme mapping for `theme_name` (unknown names fall back to
+    Default) with `custom_colors` applied. Raises ValueError for invalid colors.
+    """
+    raw = tuple(sorted(custom_colors.items())) if custom_colors else ()
+    return _resolve(theme_name, raw)
+
+
+def cache_info():
+    """lru_cache statistics of the raw and the normalized lookups."""
+    return {"requests": _resolve.cache_info()._asdict(), "resolved": _resolved.cache_info()._asdict()}
@@ -1,5 +1,6 @@
 import svgwrite
-import random
+from utils.rng import seeded_rng
+from utils.contributions import as_calendar
 
 def render(data):
     """
@@ -7,6 +8,7 @@ def render(data):
     Commits are stars. Higher commit count = brighter/larger star.
     Background: Dark void.
     """
+    rng = seeded_rng(data)
     width = 800
     height = 400
     # Make responsive: use a viewBox and percentage sizing so SVG scales on small screens
@@ -17,22 +19,21 @@ def render(data):
     
     # Random stars for "void" effect (background stars)
     for _ in range(100):
-        x = random.randint(0, width)
-        y = random.randint(0, height)
-        dwg.add(dwg.circle(center=(x, y), r=random.uniform(0.5, 1.5), fill="white", fill_opacity=0.3))
+        x = rng.randint(0, width)
+        y = rng.randint(0, height)
+        dwg.add(dwg.circle(center=(x, y), r=rng.uniform(0.5, 1.5), fill="white", fill_opacity=0.3))
 
-    contributions = [d for d in data['contributions'] if d['count'] > 0]
+    contributions = [count for count in as_calendar(data['contributions']).counts if count > 0]
     
     # To make it "Art", we scatter the actual commits as brighter stars
     # Or we can map them to a grid if we want structure, but PRD says "not as a graph".
     # So we scatter them but maybe loosely ordered or just purely random for the 'Space' feel.
     
-    for commit in contributions:
-        count = commit['count']
+    for count in contributions:
         
         # Position: Random
-        x = random.randint(20, width - 20)
-        y = random.randint(20, height - 20)
+        x = rng.randint(20, width - 20)
+        y = rng.randint(20, height - 20)
         
         # Logic: Higher commit count = brighter/larger star.
         # Radius
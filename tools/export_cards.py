@@ -0,0 +1,179 @@
+"""
+Bulk static export of GitCanvas cards
+
+Renders the stats, languages and contribution cards (and the full-size
+theme art from themes/*.py) for a list of users into a directory that any
+static file server or CDN can serve:
+
+    <out>/<username>/stats-<Theme>.svg
+    <out>/<username>/languages-<Theme>.svg
+    <out>/<username>/contributions-<Theme>.svg
+    <out>/<username>/art-<name>.svg
+
+Reruns are incremental: a file is only re-rendered when the hash of the
+user's input data differs from the one recorded in <out>/manifest.json.
+
+Usage:
+    python -m tools.export_cards users.txt --out dist --themes Default,Dracula
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from generators import stats_card, lang_card, contrib_card
+from generators.svg_optimizer import optimize_svg
+from themes import space, gaming, music, marvel, neural
+from themes.styles import THEMES
+from utils import github_api
+from utils.contributions import ContributionCalendar
+from utils.http import run_sync
+
+CARDS = ("stats", "languages", "contributions")
+ART = {"space": space, "gaming": gaming, "music": music, "marvel": marvel, "neural": neural}
+
+
+def read_usernames(path):
+    """One username per line; blank lines and # comments are ignored."""
+    with open(path, "r") as f:
+        names = [line.split("#", 1)[0].strip() for line in f]
+    seen = set()
+    return [n for n in names if n and not (n.lower() in seen or seen.add(n.lower()))]
+
+
+def data_hash(data):
+    default = lambda value: value.to_json() if isinstance(value, ContributionCalendar) else str(value)
+    blob = json.dumps(data, sort_keys=True, separators=(",", ":"), default=default)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def write_atomic(path, content):
+    """Write to a temp file in the same directory, then rename over the target."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".svg")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def render_job(data, kind, name, path, compact=False):
+    """Process-pool worker: render one card and write it. Returns the path."""
+    if kind == "stats":
+        svg = stats_card.draw_stats_card(data, name)
+    elif kind == "languages":
+        svg = lang_card.draw_lang_card(data, name)
+    elif kind == "contributions":
+        svg = contrib_card.draw_contrib_card(data, name)
+    else:
+        svg = ART[name].render(data)
+    if compact:
+        svg = optimize_svg(svg)
+    write_atomic(path, svg)
+    return path
+
+
+async def fetch_all(usernames, concurrency):
+    """Fetch every user's data with at most `concurrency` users in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(name):
+        async with semaphore:
+            return name, await github_api.get_live_github_data_async(name)
+
+    return dict(await asyncio.gather(*(fetch(n) for n in usernames)))
+
+
+def plan_jobs(username, data, themes, cards, art):
+    jobs = [(kind, theme, f"{kind}-{theme}.svg") for kind in cards for theme in themes]
+    # The full-size art needs a contribution calendar (GraphQL / mock data only)
+    if data.get("contributions"):
+        jobs += [("art", name, f"art-{name}.svg") for name in art]
+    return jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render GitCanvas cards into a static directory.")
+    parser.add_argument("usernames", help="file with one GitHub username per line")
+    parser.add_argument("--out", default="dist", help="output directory (default: dist)")
+    parser.add_argument("--themes", default=",".join(THEMES), help="comma-separated THEMES keys (default: all)")
+    parser.add_argument("--cards", default=",".join(CARDS), help="comma-separated cards (default: all)")
+    parser.add_argument("--art", default=",".join(ART), help="comma-separated theme art to render, or '' for none")
+    parser.add_argument("--concurrency", type=int, default=8, help="users fetched at once (default: 8)")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--mock", action="store_true", help="use mock data instead of calling GitHub")
+    parser.add_argument("--compact", action="store_true", help="write size-optimized SVG (see generators/svg_optimizer.py)")
+    parser.add_argument("--force", action="store_true", help="re-render even if the input data is unchanged")
+    args = parser.parse_args(argv)
+
+    themes = [t for t in args.themes.split(",") if t]
+    unknown = [t for t in themes if t not in THEMES]
+    cards = [c for c in args.cards.split(",") if c]
+    art = [a for a in args.art.split(",") if a]
+    if unknown or set(cards) - set(CARDS) or set(art) - set(ART):
+        parser.error(f"unknown theme/card/art in: {unknown + sorted(set(cards) - set(CARDS)) + sorted(set(art) - set(ART))}")
+
+    usernames = read_usernames(args.usernames)
+    start = time.time()
+    if args.mock:
+        profiles = {n: github_api.get_mock_data(n) for n in usernames}
+    else:
+        profiles = run_sync(fetch_all(usernames, args.concurrency))
+    fetched = time.time()
+
+    manifest_path = os.path.join(args.out, "manifest.json")
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    rendered = skipped = failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {}
+        for username in usernames:
+            data = profiles.get(username)
+            if data is None:
+                print(f"Skipping {username}: user not found or API unavailable", file=sys.stderr)
+                failed += 1
+                continue
+            # Switching --compact changes every file, so it is part of the digest
+            digest = data_hash(data) + ("+compact" if args.compact else "")
+            for kind, name, filename in plan_jobs(username, data, themes, cards, art):
+                rel = f"{username}/{filename}"
+                path = os.path.join(args.out, username, filename)
+                if not args.force and manifest.get(rel) == digest and os.path.exists(path):
+                    skipped += 1
+                    continue
+                futures[executor.submit(render_job, data, kind, name, path, args.compact)] = (rel, digest)
+
+        for future in as_completed(futures):
+            rel, digest = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Failed to render {rel}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            manifest[rel] = digest
+            rendered += 1
+
+    os.makedirs(args.out, exist_ok=True)
+    write_atomic(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    print(f"{len(usernames)} users: {rendered} rendered, {skipped} unchanged, {failed} failed "
+          f"(fetch {fetched - start:.1f}s, render {time.time() - fetched:.1f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Local stand-in for the GitHub APIs GitCanvas calls, for load tests
+
+Serves REST users/repos/events, GraphQL (PROFILE_QUERY and aliased batch
+queries) and the jogruber contributions API. Profiles are deterministic per
+login, so repeated runs hit the same data:
+
+- logins starting with "missing" don't exist (404 / GraphQL NOT_FOUND)
+- a login ending in "-r<N>" (e.g. "big-r5000") owns exactly N repos
+
+Latency, error injection and per-token rate limits are configurable.
+Point GitCanvas at it with:
+
+    python -m tools.fake_github --port 9000 --latency 80 --jitter 40 --error-rate 0.01
+    GITHUB_API_URL=http://127.0.0.1:9000 GITCANVAS_CONTRIB_API_URL=http://127.0.0.1:9000 \\
+        uvicorn api.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
+
+from benchmarks.synthetic import synthetic_contributions, synthetic_repos
+
+
+@dataclass
+class Config:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    secondary_rate: float = 0.0
+    rate_limit: int = 5000
+    anon_rate_limit: int = 60
+    rate_window: float = 3600.0
+    poll_interval: int = 60
+    seed: int = 0
+
+
+config = Config()
+app = FastAPI(title="Fake GitHub")
+
+_rng = random.Random(config.seed)
+# (credential, resource) -> [remaining, reset_at]
+_budgets = {}
+
+
+def _seed(login: str) -> int:
+    return int(hashlib.sha256(login.lower().encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _exists(login: str) -> bool:
+    return not login.lower().startswith("missing")
+
+
+def _repo_count(login: str) -> int:
+    match = re.search(r"-r(\d+)$", login)
+    return int(match.group(1)) if match else 1 + _seed(login) % 250
+
+
+def _repos(login: str):
+    return synthetic_repos(_repo_count(login), seed=_seed(login))
+
+
+def _contributions(login: str):
+    return synthetic_contributions(371, seed=_seed(login))
+
+
+def _user(login: str) -> dict:
+    return {
+        "login": login,
+        "id": _seed(login),
+        "public_repos": _repo_count(login),
+        "followers": _seed(login) % 5000,
+        "following": _seed(login) % 300,
+    }
+
+
+def _events(login: str) -> list:
+    rng = random.Random(_seed(login))
+    events = []
+    for i in range(30):
+        repo = {"name": f"{login}/project-{rng.randint(1, 20)}"}
+        if rng.random() < 0.5:
+            events.append({
+                "id": str(_seed(login) * 100 + i),
+                "type": "PullRequestEvent",
+                "repo": repo,
+                "payload": {
+                    "action": rng.choice(["opened", "closed"]),
+                    "pull_request": {"number": rng.randint(1, 999), "title": f"Change {i}", "merged": rng.random() < 0.3},
+                },
+            })
+        else:
+            events.append({
+                "id": str(_seed(login) * 100 + i),
+                "type": rng.choice(["IssuesEvent", "PushEvent", "WatchEvent"]),
+                "repo": repo,
+                "payload": {"action": rng.choice(["opened", "closed"]), "issue": {"number": rng.randint(1, 999), "title": f"Issue {i}"}},
+            })
+    return events
+
+
+def _graphql_user(login: str, cursor: Optional[str] = None, with_profile: bool = True) -> dict:
+    repos = _repos(login)
+    offset = int(cursor) if cursor else 0
+    page = repos[offset:offset + 100]
+    user = {
+        "login": login,
+        "repositories": {
+            "totalCount": len(repos),
+            "pageInfo": {"hasNextPage": offset + 100 < len(repos), "endCursor": str(offset + len(page))},
+            "nodes": [
+                {"stargazerCount": r["stargazers_count"], "primaryLanguage": {"name": r["language"]} if r["language"] else None}
+                for r in page
+            ],
+        },
+    }
+    if with_profile:
+        days = _contributions(login)
+        user["followers"] = {"totalCount": _user(login)["followers"]}
+        user["contributionsCollection"] = {
+            "totalCommitContributions": sum(d["count"] for d in days),
+            "contributionCalendar": {
+                "weeks": [
+                    {"contributionDays": [{"date": d["date"], "contributionCount": d["count"]} for d in days[i:i + 7]]}
+                    for i in range(0, len(days), 7)
+                ],
+            },
+        }
+    return user
+
+
+async def _delay():
+    delay = config.latency_ms + _rng.uniform(-config.jitter_ms, config.jitter_ms)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+
+def _rate_limit(request: Request, resource: str):
+    """Charge one call; returns (headers, exhausted)."""
+    auth = request.headers.get("authorization")
+    credential = auth or f"anon:{request.client.host if request.client else ''}"
+    limit = config.rate_limit if auth else config.anon_rate_limit
+    now = time.time()
+    budget = _budgets.get((credential, resource))
+    if budget is None or now >= budget[1]:
+        budget = _budgets[(credential, resource)] = [limit, now + config.rate_window]
+    exhausted = budget[0] <= 0
+    if not exhausted:
+        budget[0] -= 1
+    headers = {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(budget[0]),
+        "x-ratelimit-reset": str(int(budget[1])),
+        "x-ratelimit-resource": resource,
+    }
+    return headers, exhausted
+
+
+def _injected_error(headers: dict) -> Optional[Response]:
+    roll = _rng.random()
+    if roll < config.error_rate:
+        return Response(status_code=502, content=b'{"message":"Server Error"}', media_type="application/json", headers=headers)
+    if roll < config.error_rate + config.secondary_rate:
+        return Response(
+            status_code=403, media_type="application/json",
+            content=b'{"message":"You have exceeded a secondary rate limit."}',
+            headers={**headers, "retry-after": "1"},
+        )
+    return None
+
+
+async def _respond(request: Request, resource: str, payload, status: int = 200, extra_headers: Optional[dict] = None):
+    """Common path: latency, rate limit, error injection, ETag revalidation."""
+    await _delay()
+    headers, exhausted = _rate_limit(request, resource)
+    if exhausted:
+        return Response(status_code=403, media_type="application/json",
+                        content=b'{"message":"API rate limit exceeded"}', headers=headers)
+    error = _injected_error(headers)
+    if error is not None:
+        return error
+    headers.update(extra_headers or {})
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    if status == 200 and request.method == "GET":
+        etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        headers["etag"] = etag
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+    return Response(status_code=status, content=body, media_type="application/json", headers=headers)
+
+
+NOT_FOUND = {"message": "Not Found"}
+
+
+@app.get("/users/{login}")
+async def get_user(request: Request, login: str):
+    if not _exists(login):
+        return await _respond(request, "core", NOT_FOUND, status=404)
+    return await _respond(request, "core", _user(login))
+
+
+@app.get("/users/{login}/repos")
+async def get_repos(request: Request, login: str, per_page: int = 30, page: int = 1):
+    if not _exists(login):
+        return await _respond(request, "core", NOT_FOUND, status=404)
+    per_page = max(1, min(per_page, 100))
+    repos = _repos(login)
+    last = max(1, -(-len(repos) // per_page))
+    links = []
+    base = str(request.url.remove_query_params("page"))
+    sep = "&" if "?" in base else "?"
+    if page < last:
+        links.append(f'<{base}{sep}page={page + 1}>; rel="next"')
+        links.append(f'<{base}{sep}page={last}>; rel="last"')
+    extra = {"link": ", ".join(links)} if links else None
+    return await _respond(request, "core", repos[(page - 1) * per_page:page * per_page], extra_headers=extra)
+
+
+@app.get("/users/{login}/events")
+async def get_events(request: Request, login: str, per_page: int = 30, page: int = 1):
+    if not _exists(login):
+        return await _respond(request, "core", NOT_FOUND, status=404)
+    events = _events(login)[(page - 1) * per_page:page * per_page]
+    return await _respond(request, "core", events, extra_headers={"x-poll-interval": str(config.poll_interval)})
+
+
+@app.post("/graphql")
+async def graphql(request: Request):
+    if not request.headers.get("authorization"):
+        await _delay()
+        return Response(status_code=401, media_type="application/json",
+                        content=b'{"message":"This endpoint requires you to be authenticated."}')
+    body = await request.json()
+    variables = body.get("variables") or {}
+    data, errors = {}, []
+
+    def resolve(alias, login, **kwargs):
+        if _exists(login):
+            data[alias] = _graphql_user(login, **kwargs)
+        else:
+            data[alias] = None
+            errors.append({"type": "NOT_FOUND", "path": [alias],
+                           "message": f"Could not resolve to a User with the login of '{login}'."})
+
+    if "login" in variables:
+        resolve("user", variables["login"], cursor=variables.get("cursor"),
+                with_profile=variables.get("withProfile", True))
+    else:
+        # Aliased batch query: u0: user(login: $l0) { ...BatchProfile }
+        for alias, var in re.findall(r"(\w+): user\(login: \$(\w+)\)", body.get("query", "")):
+            resolve(alias, variables.get(var, ""))
+
+    payload = {"data": data}
+    if errors:
+        payload["errors"] = errors
+    return await _respond(request, "graphql", payload)
+
+
+@app.get("/v4/{login}")
+async def contributions(request: Request, login: str):
+    """jogruber's github-contributions-api shape."""
+    if not _exists(login):
+        return await _respond(request, "contrib", {"error": "User not found"}, status=404)
+    days = _contributions(login)
+    totals = {}
+    for day in days:
+        totals[day["date"][:4]] = totals.get(day["date"][:4], 0) + day["count"]
+    return await _respond(request, "contrib", {
+        "total": totals,
+        "contributions": [{"date": d["date"], "count": d["count"], "level": min(d["count"] // 3, 4)} for d in days],
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake GitHub REST/GraphQL/jogruber server for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean added latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- uniform latency jitter in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with 502")
+    parser.add_argument("--secondary-rate", type=float, default=0.0,
+                        help="fraction of calls answered with a secondary rate limit (403 + Retry-After)")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="calls per window per token and resource")
+    parser.add_argument("--anon-rate-limit", type=int, default=60, help="calls per window without a token")
+    parser.add_argument("--rate-window", type=float, default=3600.0, help="rate-limit window in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency jitter and error injection")
+    args = parser.parse_args(argv)
+
+    config.latency_ms = args.latency
+    config.jitter_ms = args.jitter
+    config.error_rate = args.error_rate
+    config.secondary_rate = args.secondary_rate
+    config.rate_limit = args.rate_limit
+    config.anon_rate_limit = args.anon_rate_limit
+    config.rate_window = args.rate_window
+    config.seed = args.seed
+    _rng.seed(args.seed)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Open-loop load generator for the GitCanvas API
+
+Sends card requests at a fixed target rate regardless of how fast responses
+come back, and measures latency from each request's scheduled start, so a
+stalled server shows up as queueing delay instead of a lower request rate
+(no coordinated omission). Usernames follow a Zipf distribution, like real
+traffic where a few profiles are far more popular than the rest.
+
+    python -m tools.fake_github --port 9000 --latency 80 &
+    GITHUB_API_URL=http://127.0.0.1:9000 GITCANVAS_CONTRIB_API_URL=http://127.0.0.1:9000 \\
+        uvicorn api.main:app --port 8000 &
+    python -m tools.loadtest --url http://127.0.0.1:8000 --rps 200 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from themes.styles import THEMES
+
+ENDPOINTS = ("stats", "languages", "contributions")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def make_picker(args):
+    rng = random.Random(args.seed)
+    usernames = [f"user-{i}" for i in range(args.users)]
+    weights = [1 / (i + 1) ** args.zipf for i in range(args.users)]
+    endpoints = [e for e in args.endpoints.split(",") if e]
+    themes = [t for t in args.themes.split(",") if t]
+
+    def pick():
+        username = rng.choices(usernames, weights)[0]
+        return f"/api/{rng.choice(endpoints)}", {"username": username, "theme": rng.choice(themes)}
+
+    return pick
+
+
+async def run(args):
+    pick = make_picker(args)
+    latencies = []
+    statuses = Counter()
+    cache_states = Counter()
+    errors = Counter()
+    total = int(args.rps * args.duration)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    semaphore = asyncio.Semaphore(args.max_in_flight)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        async def one(scheduled, path, params):
+            async with semaphore:
+                try:
+                    resp = await client.get(path, params=params)
+                    statuses[resp.status_code] += 1
+                    cache_states[resp.headers.get("x-cache", "-")] += 1
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+                    return
+            latencies.append(time.perf_counter() - scheduled)
+
+        tasks = []
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i / args.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(scheduled, *pick())))
+        sent = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 2) if v is not None else None
+    return {
+        "target_rps": args.rps,
+        "sent_rps": round(total / sent, 2) if sent else None,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "requests": total,
+        "completed": len(latencies),
+        "duration_s": round(elapsed, 2),
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(latencies[-1] if latencies else None),
+            "mean": ms(sum(latencies) / len(latencies) if latencies else None),
+        },
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "x_cache": dict(cache_states),
+        "errors": dict(errors),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the GitCanvas API at a target request rate.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--rps", type=float, default=50, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to send for")
+    parser.add_argument("--users", type=int, default=500, help="distinct usernames to draw from")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of username popularity")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated card endpoints")
+    parser.add_argument("--themes", default=",".join(THEMES), help="comma-separated themes")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="cap on concurrent requests")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if not report["errors"] and report["completed"] == report["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
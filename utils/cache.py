@@ -0,0 +1,195 @@
+"""
+In-process caching helpers shared by the data layer
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def normalize_username(username: str) -> str:
+    """GitHub logins are case-insensitive, so cache keys are too."""
+    return (username or "").strip().lower()
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "expires_at", "stale_until", "delta")
+
+    def __init__(self, value, stored_at, expires_at, stale_until, delta):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.delta = delta
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a TTL and stale-while-revalidate.
+
+    - Entries are fresh for `ttl` seconds, then servable as stale for another
+      `stale_ttl` seconds while a single background refresh runs.
+    - Probabilistic early expiration (XFetch) makes hot keys refresh slightly
+      before their TTL, weighted by how long the value took to compute, so
+      they don't all expire at once.
+    - At most `maxsize` entries are kept; the least recently used is evicted.
+      If `weigher` and `max_weight` are given, entries are also evicted until
+      the summed weight (e.g. bytes) fits the budget.
+    - If `ttl_for` is given, it picks the TTL of each loaded value (e.g. from
+      an upstream poll interval); returning None falls back to `ttl`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600, stale_ttl: float = 3600, beta: float = 1.0,
+                 weigher: Optional[Callable[[Any], int]] = None, max_weight: Optional[int] = None,
+                 ttl_for: Optional[Callable[[Any], Optional[float]]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttl_for = ttl_for
+        self.stale_ttl = stale_ttl
+        self.beta = beta
+        self.weigher = weigher
+        self.max_weight = max_weight
+        self.weight = 0
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.lookup(key)[1] != MISS
+
+    def lookup(self, key: Hashable) -> Tuple[Any, str]:
+        """Return (value, state) where state is FRESH, STALE or MISS."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None, MISS
+            if now >= entry.stale_until:
+                self._pop(key)
+                return None, MISS
+            self._data.move_to_end(key)
+            if self._expired(entry, now):
+                return entry.value, STALE
+            return entry.value, FRESH
+
+    def expires_in(self, key: Hashable) -> Optional[float]:
+        """Seconds until `key` goes stale (negative once stale), or None if absent."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        return entry.expires_at - time.time()
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        if now >= entry.expires_at:
+            return True
+        if entry.delta <= 0 or self.beta <= 0:
+            return False
+        # XFetch: -delta * beta * log(U) grows as U -> 0, so each reader has a
+        # small, increasing chance of triggering the refresh before expiry.
+        return now - entry.delta * self.beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+    def set(self, key: Hashable, value: Any, delta: float = 0.0, ttl: Optional[float] = None):
+        """Store a value. `delta` is how long it took to compute, in seconds."""
+        now = time.time()
+        if ttl is None and self.ttl_for is not None:
+            ttl = self.ttl_for(value)
+        ttl = self.ttl if ttl is None else ttl
+        entry = _Entry(value, now, now + ttl, now + ttl + self.stale_ttl, delta)
+        with self._lock:
+            self._pop(key)
+            self._data[key] = entry
+            if self.weigher:
+                self.weight += self.weigher(value)
+            while len(self._data) > self.maxsize or (
+                self.max_weight is not None and self.weight > self.max_weight and len(self._data) > 1
+            ):
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None and self.weigher:
+            self.weight -= self.weigher(entry.value)
+        return entry
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    async def afetch(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """
+        Return (value, state) for `key`, awaiting the coroutine function
+        `loader()` on a miss. Stale values are returned immediately and
+        refreshed by a task on the current event loop (one per key). A loader
+        result of None is never cached.
+        """
+        value, state = self.lookup(key)
+        if state == FRESH:
+            self.hits += 1
+            return value, state
+        if state == STALE:
+            self.stale_hits += 1
+            self._arefresh_in_background(key, loader)
+            return value, state
+        self.misses += 1
+        return await self._aload(key, loader), state
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """The value part of afetch()."""
+        return (await self.afetch(key, loader))[0]
+
+    async def _aload(self, key, loader):
+        start = time.time()
+        value = await loader()
+        if value is not None:
+            self.set(key, value, delta=time.time() - start)
+        return value
+
+    def _arefresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def run():
+            try:
+                await self._aload(key, loader)
+            except Exception as e:
+                print(f"Cache refresh failed for {key!r}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        # Keep a reference so the task isn't garbage-collected mid-flight
+        task = asyncio.ensure_future(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "weight": self.weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale_hits,
+        }
@@ -0,0 +1,191 @@
+"""
+Compact contribution calendar
+
+A profile's contribution history used to be a list of {"date", "count"}
+dicts, roughly 300 bytes per day. ContributionCalendar stores the first
+day as a day number (days since 1970-01-01) and one unsigned 16-bit count
+per day in an array('H'), 2 bytes per day. Days are contiguous, so:
+
+- count_on(date) is an index computation, O(1)
+- between(start, end) and last(n) are O(1) and return views that share
+  the parent's buffer (memoryview slices, no copy)
+
+GraphQL responses are decoded straight into calendars: CalendarDecoder is
+a json object_hook, so each contributionDays entry goes into the counts
+buffer as the decoder reaches it and no per-day dicts are kept.
+"""
+
+import datetime
+from array import array
+from typing import Iterable, Optional, Union
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+MAX_COUNT = 0xFFFF
+
+DateLike = Union[str, datetime.date, int]
+
+
+def day_number(value: DateLike) -> int:
+    """Days since 1970-01-01 for an ISO date string, a date, or a day number."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def day_date(number: int) -> datetime.date:
+    return datetime.date.fromordinal(number + EPOCH_ORDINAL)
+
+
+class ContributionCalendar:
+    """
+    Contribution counts for consecutive days starting at day number `start`.
+    Iterating and integer indexing yield {"date", "count"} dicts like the old
+    list did; slicing with a step of 1 returns a view.
+    """
+
+    __slots__ = ("start", "counts")
+
+    def __init__(self, start: int = 0, counts=None):
+        self.start = start
+        self.counts = memoryview(counts if counts is not None else array("H"))
+
+    @classmethod
+    def from_days(cls, days: Iterable[dict]) -> "ContributionCalendar":
+        """From {"date", "count"} dicts in any order; missing days count 0."""
+        builder = CalendarBuilder()
+        for day in days:
+            builder.add(day["date"], day.get("count", 0))
+        return builder.finish()
+
+    @classmethod
+    def from_json(cls, payload) -> "ContributionCalendar":
+        """Inverse of to_json(); also accepts the old list of {"date", "count"} dicts."""
+        if isinstance(payload, dict):
+            return cls(day_number(payload["start"]), array("H", payload["counts"]))
+        return cls.from_days(payload or ())
+
+    def to_json(self) -> dict:
+        return {"start": day_date(self.start).isoformat(), "counts": self.counts.tolist()}
+
+    def __reduce__(self):
+        # memoryviews don't pickle (process pools, st.cache_data); ship a copy of the counts
+        return ContributionCalendar, (self.start, array("H", self.counts))
+
+    @property
+    def first_date(self) -> Optional[datetime.date]:
+        return day_date(self.start) if self.counts else None
+
+    @property
+    def last_date(self) -> Optional[datetime.date]:
+        return day_date(self.start + len(self.counts) - 1) if self.counts else None
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __iter__(self):
+        for offset, count in enumerate(self.counts):
+            yield {"date": day_date(self.start + offset).isoformat(), "count": count}
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            begin, end, step = key.indices(len(self.counts))
+            if step != 1:
+                raise ValueError("ContributionCalendar slices must be contiguous")
+            end = max(begin, end)
+            return ContributionCalendar(self.start + begin, self.counts[begin:end])
+        index = key + len(self.counts) if key < 0 else key
+        return {"date": day_date(self.start + index).isoformat(), "count": self.counts[key]}
+
+    def __eq__(self, other):
+        if not isinstance(other, ContributionCalendar):
+            return NotImplemented
+        return self.start == other.start and self.counts == other.counts
+
+    def __repr__(self):
+        if not self.counts:
+            return "ContributionCalendar([])"
+        return f"ContributionCalendar({self.first_date}..{self.last_date}, {len(self.counts)} days)"
+
+    def count_on(self, date: DateLike) -> int:
+        """Contributions on `date`; 0 outside the calendar."""
+        offset = day_number(date) - self.start
+        return self.counts[offset] if 0 <= offset < len(self.counts) else 0
+
+    def between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> "ContributionCalendar":
+        """View of the days from `start` to `end`, both inclusive and clamped to the calendar."""
+        begin = 0 if start is None else max(0, day_number(start) - self.start)
+        stop = len(self.counts) if end is None else min(len(self.counts), day_number(end) - self.start + 1)
+        return self[begin:max(begin, stop)]
+
+    def last(self, days: int) -> "ContributionCalendar":
+        """View of the most recent `days` days."""
+        return self[max(0, len(self.counts) - days):]
+
+    def total(self) -> int:
+        return sum(self.counts)
+
+
+class CalendarBuilder:
+    """Collects (date, count) pairs into a ContributionCalendar."""
+
+    __slots__ = ("start", "counts")
+
+    def __init__(self):
+        self.start = None
+        self.counts = array("H")
+
+    def add(self, date: DateLike, count: int):
+        number = day_number(date)
+        count = min(max(int(count), 0), MAX_COUNT)
+        if self.start is None:
+            self.start = number
+        offset = number - self.start
+        if offset == len(self.counts):
+            self.counts.append(count)
+        elif offset > len(self.counts):
+            self.counts.extend([0] * (offset - len(self.counts)))
+            self.counts.append(count)
+        elif offset >= 0:
+            self.counts[offset] = count
+        else:
+            # Earlier than anything so far (out-of-order input): grow at the front
+            self.counts = array("H", [count] + [0] * (-offset - 1)) + self.counts
+            self.start = number
+
+    def finish(self) -> ContributionCalendar:
+        calendar = ContributionCalendar(self.start or 0, self.counts)
+        self.start, self.counts = None, array("H")
+        return calendar
+
+
+class CalendarDecoder:
+    """
+    json object_hook that turns every contributionCalendar object into a
+    ContributionCalendar while the response is decoded:
+
+        resp.json(object_hook=CalendarDecoder())
+
+    Objects are decoded innermost first and in document order, so a
+    calendar's days all arrive before its {"weeks": [...]} object, and
+    calendars of several users (aliased batch queries) don't interleave.
+    """
+
+    def __init__(self):
+        self.builder = CalendarBuilder()
+
+    def __call__(self, obj: dict):
+        if "contributionCount" in obj and "date" in obj and len(obj) == 2:
+            self.builder.add(obj["date"], obj["contributionCount"])
+            return None
+        if "weeks" in obj and len(obj) == 1:
+            return self.builder.finish()
+        return obj
+
+
+def as_calendar(value) -> ContributionCalendar:
+    """A ContributionCalendar from a calendar, a list of day dicts, or None (empty)."""
+    if isinstance(value, ContributionCalendar):
+        return value
+    return ContributionCalendar.from_days(value or ())
@@ -1,65 +1,266 @@
-import requests
+import asyncio
+import hashlib
 import os
+import re
+import time
+from urllib.parse import urlparse, parse_qs
+from array import array
+from utils.cache import MISS, TTLCache, normalize_username
+from utils.contributions import CalendarBuilder, CalendarDecoder, ContributionCalendar, day_number
+from utils import http
+from utils.http import run_sync
+from utils.metrics import FETCH_ERRORS
+from utils import timing
+from utils.singleflight import SingleFlight
+from utils.tokens import get_pool
+from utils.store import profile_store
 
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# Upstream base URLs; point them at tools/fake_github.py for load tests
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+CONTRIB_API_URL = os.getenv("GITCANVAS_CONTRIB_API_URL", "https://github-contributions-api.jogruber.de").rstrip("/")
 
+# Shared profile cache: fresh for PROFILE_TTL seconds, then served stale for
+# up to PROFILE_STALE_TTL more while a background refresh runs.
+PROFILE_TTL = float(os.getenv("GITCANVAS_PROFILE_TTL", "600"))
+PROFILE_STALE_TTL = float(os.getenv("GITCANVAS_PROFILE_STALE_TTL", "86400"))
+PROFILE_CACHE_SIZE = int(os.getenv("GITCANVAS_PROFILE_CACHE_SIZE", "1024"))
 
+profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_TTL, stale_ttl=PROFILE_STALE_TTL)
 
-def fetch_github_graphql(username):
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        return None
+# Concurrent cache misses for the same username share one upstream fetch
+profile_flight = SingleFlight("profile")
+
+# Recent activity (events) per user. GitHub asks clients not to poll events
+# more often than its X-Poll-Interval header, so that overrides EVENTS_TTL
+# when it is longer.
+EVENTS_TTL = float(os.getenv("GITCANVAS_EVENTS_TTL", "60"))
+EVENTS_STALE_TTL = float(os.getenv("GITCANVAS_EVENTS_STALE_TTL", "3600"))
+EVENTS_CACHE_SIZE = int(os.getenv("GITCANVAS_EVENTS_CACHE_SIZE", "1024"))
+# Parsed PR/issue events kept per user; the card shows the newest 3
+ACTIVITY_LIMIT = 10
+
+events_cache = TTLCache(
+    maxsize=EVENTS_CACHE_SIZE, ttl=EVENTS_TTL, stale_ttl=EVENTS_STALE_TTL,
+    ttl_for=lambda feed: max(EVENTS_TTL, feed.get("poll_interval") or 0),
+)
+events_flight = SingleFlight("events")
+
+REPOS_PER_PAGE = 100
+# Upper bound on repo pages fetched at once for a single user
+REPO_PAGE_CONCURRENCY = int(os.getenv("GITCANVAS_REPO_PAGE_CONCURRENCY", "8"))
 
-    query = """
-    query ($login: String!) {
-      user(login: $login) {
-        contributionsCollection {
-          totalCommitContributions
-          contributionCalendar {
-            weeks {
-              contributionDays {
-                date
-                contributionCount
-              }
-            }
+
+
+# Everything the cards need in one round trip. Later pages of repositories
+# (for users with more than 100) reuse the query with $cursor set and
+# $withProfile false, so only the repository connection is fetched again.
+PROFILE_QUERY = """
+query ($login: String!, $cursor: String, $withProfile: Boolean = true) {
+  user(login: $login) {
+    login
+    followers @include(if: $withProfile) { totalCount }
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes { stargazerCount primaryLanguage { name } }
+    }
+    contributionsCollection @include(if: $withProfile) {
+      totalCommitContributions
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
           }
         }
       }
     }
-    """
+  }
+}
+"""
 
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
+class UserNotFound(Exception):
+    pass
+
+async def fetch_github_graphql(username, cursor=None, with_profile=True):
+    """
+    Runs PROFILE_QUERY. Returns the decoded response, or None if GraphQL is
+    unavailable (no token, HTTP error). Raises UserNotFound for unknown logins.
+    """
+    # GraphQL has no anonymous access
+    if not get_pool().authenticated:
+        return None
 
-    resp = requests.post(
+    resp = await http.apost(
         GITHUB_GRAPHQL_URL,
-        json={"query": query, "variables": {"login": username}},
-        headers=headers,
-        timeout=10
+        json={
+            "query": PROFILE_QUERY,
+            "variables": {"login": username, "cursor": cursor, "withProfile": with_profile},
+        },
+        resource="graphql",
     )
 
     if resp.status_code != 200:
         return None
-    
 
-    return resp.json()
+    result = resp.json(object_hook=CalendarDecoder())
+    if (result.get("data") or {}).get("user") is None:
+        if any(e.get("type") == "NOT_FOUND" for e in result.get("errors", [])):
+            raise UserNotFound(username)
+        return None
+    return result
+
+async def fetch_graphql_profile(username):
+    """
+    Builds the profile from PROFILE_QUERY alone: followers, public repo
+    count, stars and languages over every repo, and the contribution calendar.
+    Returns None if GraphQL is unavailable so callers can fall back to REST.
+    """
+    result = await fetch_github_graphql(username)
+    if result is None:
+        return None
+    return await _profile_from_graphql_user(username, result["data"]["user"])
+
+async def _profile_from_graphql_user(username, user):
+    """
+    Turns a PROFILE_QUERY-shaped user object into profile data.
+    GraphQL pages through repos by cursor, one round trip per 100; users
+    with more than one page get their repo totals from fetch_repo_stats
+    instead, whose REST pages are fetched in parallel. The cursor walk is
+    only the fallback if REST gives nothing.
+    """
+    repos = user["repositories"]
+
+    stats = RepoStats()
+    stats.add_nodes(repos["nodes"])
+    page_info = repos["pageInfo"]
+    if page_info["hasNextPage"]:
+        try:
+            rest_stats = await fetch_repo_stats(username, get_github_headers(), public_repos=repos["totalCount"])
+        except Exception as e:
+            print(f"Repos API Error: {e}")
+            FETCH_ERRORS.inc("repos")
+            rest_stats = None
+        if rest_stats is not None and rest_stats.repo_count:
+            stats = rest_stats
+            page_info = {"hasNextPage": False}
+    while page_info["hasNextPage"]:
+        page = await fetch_github_graphql(username, cursor=page_info["endCursor"], with_profile=False)
+        if page is None:
+            break
+        page_repos = page["data"]["user"]["repositories"]
+        stats.add_nodes(page_repos["nodes"])
+        page_info = page_repos["pageInfo"]
+
+    contributions, total_commits = parse_graphql_contributions({"data": {"user": user}})
+    return {
+        "username": username,
+        "total_stars": stats.total_stars,
+        "total_commits": total_commits,
+        "public_repos": repos["totalCount"],
+        "followers": user["followers"]["totalCount"],
+        "top_languages": stats.top_languages(),
+        "contributions": contributions,
+    }
+
+# Same fields as PROFILE_QUERY, for many users per request via aliases
+BATCH_PROFILE_FRAGMENT = """
+fragment BatchProfile on User {
+  login
+  followers { totalCount }
+  repositories(first: 100, ownerAffiliations: OWNER, privacy: PUBLIC) {
+    totalCount
+    pageInfo { hasNextPage endCursor }
+    nodes { stargazerCount primaryLanguage { name } }
+  }
+  contributionsCollection {
+    totalCommitContributions
+    contributionCalendar {
+      weeks {
+        contributionDays {
+          date
+          contributionCount
+        }
+      }
+    }
+  }
+}
+"""
+
+# Users per aliased GraphQL query; calendars are large, so keep chunks modest
+GRAPHQL_BATCH_SIZE = int(os.getenv("GITCANVAS_GRAPHQL_BATCH_SIZE", "10"))
+# Concurrent single-user fetches when batching without a token
+BATCH_FETCH_CONCURRENCY = int(os.getenv("GITCANVAS_BATCH_FETCH_CONCURRENCY", "8"))
+
+async def fetch_graphql_profiles(usernames):
+    """
+    Fetches several profiles with one aliased query per GRAPHQL_BATCH_SIZE
+    users (u0: user(login: $l0) { ...BatchProfile } ...).
+    Returns {username: data}, or None for logins GraphQL reports as
+    NOT_FOUND; every other username (GraphQL unavailable, partial errors)
+    is left out so callers can fetch it singly.
+    """
+    if not get_pool().authenticated or not usernames:
+        return {}
+
+    async def fetch_chunk(chunk):
+        params = ", ".join(f"$l{i}: String!" for i in range(len(chunk)))
+        fields = "\n".join(f"  u{i}: user(login: $l{i}) {{ ...BatchProfile }}" for i in range(len(chunk)))
+        query = f"query ({params}) {{\n{fields}\n}}\n" + BATCH_PROFILE_FRAGMENT
+        resp = await http.apost(
+            GITHUB_GRAPHQL_URL,
+            json={"query": query, "variables": {f"l{i}": name for i, name in enumerate(chunk)}},
+            resource="graphql",
+        )
+        if resp.status_code != 200:
+            return {}
+        result = resp.json(object_hook=CalendarDecoder())
+        data = result.get("data") or {}
+        not_found = {
+            error["path"][0] for error in result.get("errors") or []
+            if error.get("type") == "NOT_FOUND" and error.get("path")
+        }
+        out = {}
+        for i, name in enumerate(chunk):
+            user = data.get(f"u{i}")
+            if user:
+                out[name] = await _profile_from_graphql_user(name, user)
+            elif f"u{i}" in not_found:
+                out[name] = None
+            # Anything else (data: null, other errors) is left out for the single-user fallback
+        return out
+
+    chunks = [usernames[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(usernames), GRAPHQL_BATCH_SIZE)]
+    results = {}
+    for chunk_result in await asyncio.gather(*(fetch_chunk(c) for c in chunks), return_exceptions=True):
+        if isinstance(chunk_result, BaseException):
+            print(f"GraphQL batch Error: {chunk_result}")
+            FETCH_ERRORS.inc("graphql_batch")
+            continue
+        results.update(chunk_result)
+    return results
 
 def parse_graphql_contributions(graphql_json):
-    weeks = (
+    with timing.span("normalize"):
+        return _parse_graphql_contributions(graphql_json)
+
+def _parse_graphql_contributions(graphql_json):
+    calendar = (
         graphql_json["data"]["user"]
         ["contributionsCollection"]
         ["contributionCalendar"]
-        ["weeks"]
     )
 
-    contributions = []
-    for week in weeks:
-        for day in week["contributionDays"]:
-            contributions.append({
-                "date": day["date"],
-                "count": day["contributionCount"]
-            })
+    # Responses decoded with CalendarDecoder already hold a ContributionCalendar
+    if isinstance(calendar, ContributionCalendar):
+        contributions = calendar
+    else:
+        builder = CalendarBuilder()
+        for week in calendar["weeks"]:
+            for day in week["contributionDays"]:
+                builder.add(day["date"], day["contributionCount"])
+        contributions = builder.finish()
 
     total_commits = (
         graphql_json["data"]["user"]
@@ -73,93 +274,419 @@ def parse_graphql_contributions(graphql_json):
 def get_github_headers():
     """
     Build headers for GitHub REST API requests.
-    Uses Authorization header if GITHUB_TOKEN is set.
+    Authorization is added per call from the token pool (see utils/tokens.py),
+    by passing resource="core" to the http helpers.
     """
     headers = {
         "Accept": "application/vnd.github+json"
     }
 
-    token = os.getenv("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
     return headers
 
 def get_live_github_data(username):
     """
-    Fetches real data from GitHub API. 
+    Returns profile data for `username`, served from the shared profile cache.
+    Returns None if the user can't be fetched and nothing is cached.
+    Synchronous wrapper around get_live_github_data_async for Streamlit/CLI use.
+    """
+    return run_sync(get_live_github_data_async(username))
+
+async def get_live_github_data_async(username):
+    """Async version of get_live_github_data for use inside the API's event loop."""
+    key = normalize_username(username)
+    if not key:
+        return None
+    if profile_cache.lookup(key)[1] == MISS:
+        warm_from_store(key)
+    return await profile_cache.aget_or_load(
+        key, lambda: profile_flight.ado(key, lambda: _fetch_and_store(key, username))
+    )
+
+async def get_many_github_data_async(usernames):
+    """
+    Profile data for many users at once, keyed by normalized username.
+    Cached users are served from the profile cache; the rest are fetched
+    together (aliased GraphQL with a token, bounded concurrent fetches
+    otherwise) and written back to the cache and store.
+    """
+    keys = {}
+    for name in usernames:
+        key = normalize_username(name)
+        if key:
+            keys.setdefault(key, name)
+
+    results, misses = {}, []
+    for key, name in keys.items():
+        if profile_cache.lookup(key)[1] == MISS and not warm_from_store(key):
+            misses.append(key)
+        else:
+            results[key] = await get_live_github_data_async(name)
+
+    fetched = {
+        normalize_username(name): data
+        for name, data in (await fetch_graphql_profiles([keys[key] for key in misses])).items()
+    }
+    for key, data in fetched.items():
+        if data is not None:
+            profile_cache.set(key, data)
+            profile_store.save_profile(key, data)
+        results[key] = data
+
+    semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+
+    async def fetch_one(key):
+        async with semaphore:
+            results[key] = await get_live_github_data_async(keys[key])
+
+    await asyncio.gather(*(fetch_one(key) for key in misses if key not in fetched))
+    return results
+
+def refresh_github_data(username):
+    """Force a fetch from GitHub, replacing the cached and stored copies."""
+    return run_sync(refresh_github_data_async(username))
+
+async def refresh_github_data_async(username):
+    """Async refresh_github_data; joins an in-flight fetch for the same user if there is one."""
+    key = normalize_username(username)
+    if not key:
+        return None
+    data = await profile_flight.ado(key, lambda: _fetch_and_store(key, username))
+    if data is not None:
+        profile_cache.set(key, data)
+    return data
+
+def warm_from_store(key):
+    """
+    Seed the in-memory cache from the on-disk profile store, keeping the
+    record's age: a recent record is served as fresh, an older one as stale
+    (and refreshed in the background), and one past the stale window is ignored.
+    """
+    found = profile_store.load_profile(key)
+    if found is None:
+        return False
+    data, fetched_at = found
+    age = time.time() - fetched_at
+    if age >= PROFILE_TTL + PROFILE_STALE_TTL:
+        return False
+    profile_cache.set(key, data, ttl=PROFILE_TTL - age)
+    return True
+
+async def _fetch_and_store(key, username):
+    data = await fetch_live_github_data_async(username)
+    if data is not None:
+        profile_store.save_profile(key, data)
+    return data
+
+def get_recent_activity(username, token=None):
+    """Synchronous get_recent_activity_async for Streamlit/CLI use."""
+    return run_sync(get_recent_activity_async(username, token))
+
+async def get_recent_activity_async(username, token=None):
+    """
+    The user's recent PR and issue activity, from the per-user events cache:
+    {"username", "activity": [newest first], "error": message or None, ...}.
+
+    A caller-supplied token can expose private events, so its feed is cached
+    separately (keyed by a hash of the token) and never persisted.
+    Never raises; failures come back in "error" so the card can show them.
+    """
+    user_key = normalize_username(username)
+    if not user_key:
+        return {"username": username, "activity": [], "error": "No username given"}
+    key = f"{user_key}#{hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]}" if token else user_key
+    if not token and events_cache.lookup(key)[1] == MISS:
+        _warm_events_from_store(key)
+    try:
+        return await events_cache.aget_or_load(
+            key, lambda: events_flight.ado(key, lambda: _refresh_activity(key, username, token))
+        )
+    except Exception as e:
+        FETCH_ERRORS.inc("events")
+        return {"username": username, "activity": [], "error": f"Error fetching events: {e}"}
+
+def _warm_events_from_store(key):
+    found = profile_store.load_events(key)
+    # Rows from before the feed format held raw event lists
+    if found is None or not isinstance(found[0], dict):
+        return
+    feed, fetched_at = found
+    age = time.time() - fetched_at
+    ttl = max(EVENTS_TTL, feed.get("poll_interval") or 0)
+    if age < ttl + EVENTS_STALE_TTL:
+        events_cache.set(key, feed, ttl=ttl - age)
+
+async def _refresh_activity(key, username, token):
+    """
+    Revalidate the user's feed with a conditional GET. A 304 (which doesn't
+    count against the rate limit) keeps the cached activity; a 200 only has
+    its events newer than the feed's cursor parsed and prepended.
+    """
+    previous = events_cache.lookup(key)[0]
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+
+    # A caller-supplied token is used as-is; otherwise take one from the pool
+    resp = await http.aget(f"{GITHUB_API_URL}/users/{username}/events", headers=headers,
+                           resource=None if token else "core")
+    try:
+        poll_interval = int(resp.headers.get("x-poll-interval", 0))
+    except ValueError:
+        poll_interval = 0
+
+    if resp.status_code == 304 and previous:
+        feed = dict(previous, poll_interval=poll_interval)
+    elif resp.status_code == 200:
+        since = previous.get("cursor") if previous else None
+        new_items, cursor = parse_events(resp.json(), since)
+        old_items = previous["activity"] if previous else []
+        feed = {
+            "username": username,
+            "activity": (new_items + old_items)[:ACTIVITY_LIMIT],
+            "cursor": cursor or since,
+            "etag": resp.headers.get("etag"),
+            "poll_interval": poll_interval,
+            "error": None,
+        }
+    elif previous and not previous.get("error"):
+        # Keep showing the last good activity through upstream errors
+        FETCH_ERRORS.inc("events")
+        return previous
+    else:
+        feed = {"username": username, "activity": [], "cursor": None, "etag": None,
+                "poll_interval": poll_interval, "error": f"GitHub API error: {resp.status_code}"}
+
+    if not token:
+        profile_store.save_events(key, feed)
+    return feed
+
+def parse_events(events, since=None):
+    """
+    Compact PR/issue activity items from a newest-first events page,
+    stopping at the event with id `since` (already parsed on an earlier
+    poll). Returns (items, id of the newest event or None).
+    """
+    with timing.span("normalize"):
+        items = []
+        for ev in events:
+            if since is not None and _event_id(ev) <= _event_id({"id": since}):
+                break
+            payload = ev.get("payload") or {}
+            if ev.get("type") == "PullRequestEvent":
+                subject, kind = payload.get("pull_request") or {}, "pr"
+            elif ev.get("type") == "IssuesEvent":
+                subject, kind = payload.get("issue") or {}, "issue"
+            else:
+                continue
+            items.append({
+                "kind": kind,
+                "action": payload.get("action"),
+                "number": subject.get("number"),
+                "title": subject.get("title") or "",
+                "repo": (ev.get("repo") or {}).get("name", ""),
+                "merged": bool(subject.get("merged")),
+            })
+        return items, (events[0].get("id") if events else None)
+
+def _event_id(event):
+    # Event ids are increasing numeric strings
+    try:
+        return int(event.get("id"))
+    except (TypeError, ValueError):
+        return 0
+
+def fetch_live_github_data(username):
+    """Fetches real data from GitHub API, bypassing the cache."""
+    return run_sync(fetch_live_github_data_async(username))
+
+async def _get_json(url, headers=None, resource=None, fields=None):
+    """
+    Conditional GET of a JSON document, returning (status_code, payload or None).
+    Unchanged resources come back as a 304 and are served from the ETag store.
+    Pass resource="core" for GitHub URLs so a pool token is attached, and
+    `fields` to keep (and store) only the keys that are read.
+    """
+    result = await http.aget_json(url, headers=headers, resource=resource, fields=fields)
+    return result.status, result.data
+
+# The only REST fields the aggregation reads; the rest of each object is dropped on arrival
+REPO_FIELDS = ("stargazers_count", "language")
+USER_FIELDS = ("public_repos", "followers")
+
+class RepoStats:
+    """Running totals over a user's repos, fed one page at a time."""
+
+    def __init__(self):
+        self.total_stars = 0
+        self.repo_count = 0
+        self.languages = {}
+
+    def add_page(self, repos):
+        with timing.span("normalize"):
+            for repo in repos:
+                self.repo_count += 1
+                self.total_stars += repo.get("stargazers_count", 0)
+                lang = repo.get("language")
+                if lang:
+                    self.languages[lang] = self.languages.get(lang, 0) + 1
+
+    def add_nodes(self, nodes):
+        """Same as add_page, for GraphQL repository nodes."""
+        with timing.span("normalize"):
+            for repo in nodes:
+                self.repo_count += 1
+                self.total_stars += repo.get("stargazerCount", 0)
+                lang = (repo.get("primaryLanguage") or {}).get("name")
+                if lang:
+                    self.languages[lang] = self.languages.get(lang, 0) + 1
+
+    def top_languages(self, n=5):
+        return sorted(self.languages.items(), key=lambda x: x[1], reverse=True)[:n]
+
+def _last_page(link):
+    """Number of the last page from GitHub's Link header, or None if there is no rel="last"."""
+    match = re.search(r'<([^>]+)>;\s*rel="last"', link or "")
+    if not match:
+        return None
+    try:
+        return int(parse_qs(urlparse(match.group(1)).query)["page"][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+async def fetch_repo_stats(username, headers=None, public_repos=None):
+    """
+    Aggregates stars and languages over *all* of the user's owned repos.
+
+    Page 1 tells us the page count (Link header, or `public_repos` as a
+    hint); pages 2..N are then fetched in parallel with bounded concurrency.
+    Each page is folded into the totals as soon as it arrives and dropped,
+    so at most REPO_PAGE_CONCURRENCY pages of repo JSON are alive at once.
+    """
+    repos_url = f"{GITHUB_API_URL}/users/{username}/repos"
+    stats = RepoStats()
+
+    async def get_page(page):
+        params = {"per_page": REPOS_PER_PAGE, "type": "owner", "page": page}
+        return await http.aget_json(repos_url, headers=headers, params=params, resource="core",
+                                    fields=REPO_FIELDS)
+
+    first = await get_page(1)
+    if first.status != 200:
+        return stats
+    first_page = first.data
+    stats.add_page(first_page)
+
+    last_page = _last_page(first.link)
+    if last_page is None and public_repos and len(first_page) == REPOS_PER_PAGE:
+        last_page = -(-public_repos // REPOS_PER_PAGE)
+    del first_page
+
+    if last_page and last_page > 1:
+        semaphore = asyncio.Semaphore(REPO_PAGE_CONCURRENCY)
+
+        async def fetch_and_add(page):
+            async with semaphore:
+                result = await get_page(page)
+                if result.status == 200:
+                    stats.add_page(result.data)
+
+        await asyncio.gather(*(fetch_and_add(page) for page in range(2, last_page + 1)))
+    elif last_page is None and stats.repo_count == REPOS_PER_PAGE:
+        # No Link header and no count hint: walk the remaining pages in order
+        page = 2
+        while True:
+            result = await get_page(page)
+            repos = result.data if result.status == 200 else []
+            stats.add_page(repos)
+            if len(repos) < REPOS_PER_PAGE:
+                break
+            page += 1
+
+    return stats
+
+async def _fetch_contrib_total(username):
+    """Sum of all yearly totals from the jogruber contributions API (0 on failure)."""
+    try:
+        contrib_url = f"{CONTRIB_API_URL}/v4/{username}"
+        _, c_data = await _get_json(contrib_url, fields=("total",))
+        if c_data and 'total' in c_data and isinstance(c_data['total'], dict):
+            # Sum all year totals into a single integer
+            return sum(c_data['total'].values())
+        # If the response isn't 200, it stays as 0
+    except Exception as ex:
+        print(f"Contrib API Error: {ex}")
+        FETCH_ERRORS.inc("contributions")
+    return 0 # Safety fallback
+
+async def fetch_live_github_data_async(username):
+    """
+    Fetches real data from GitHub API, bypassing the cache. 
+    With a token this is a single GraphQL query (plus one per extra 100
+    repos); REST is only used without a token or if GraphQL fails.
+    """
+    try:
+        data = await fetch_graphql_profile(username)
+        if data is not None:
+            return data
+    except UserNotFound:
+        return None
+    except Exception as e:
+        print(f"GraphQL Error: {e}")
+        FETCH_ERRORS.inc("graphql")
+    return await fetch_rest_github_data(username)
+
+async def fetch_rest_github_data(username):
+    """
+    Unauthenticated fallback built from REST endpoints.
+    The user, repos and contributions calls don't depend on each other, so
+    they are issued concurrently on the pooled client; latency is roughly
+    that of the slowest single upstream call.
     Notes: 
     - Unauthenticated requests are rate-limited (60/hr).
-    - For a real production app, we need a token or use GraphQL.
-    - For this MVP, we scrape or use public endpoints where possible to avoid token complexity for the user usage.
+    - The contribution calendar is only available through GraphQL.
     """
     try:
-        # User details
-        user_url = f"https://api.github.com/users/{username}"
         headers = get_github_headers()
-        user_resp = requests.get(user_url, headers=headers)
+        user_url = f"{GITHUB_API_URL}/users/{username}"
+
+        user_res, repo_stats, total_commits = await asyncio.gather(
+            _get_json(user_url, headers, resource="core", fields=USER_FIELDS),
+            # Repos for stars and languages, every page
+            fetch_repo_stats(username, headers),
+            _fetch_contrib_total(username),
+            return_exceptions=True,
+        )
 
-        if user_resp.status_code != 200:
+        # User details
+        if isinstance(user_res, BaseException):
+            raise user_res
+        user_status, user_data = user_res
+        if user_status != 200:
             return None
-        user_data = user_resp.json()
-        
-        # Repos for stars count (limited to first 100 public repos for basic sum without pagination for MVP speed)
-        repos_url = f"https://api.github.com/users/{username}/repos?per_page=100&type=owner"
-        repos_resp = requests.get(repos_url, headers=headers)
-        repos_data = repos_resp.json() if repos_resp.status_code == 200 else []
-        
-        total_stars = sum(repo.get("stargazers_count", 0) for repo in repos_data)
-        
-        # Languages (Approximation from top repos)
-        languages = {}
-        for repo in repos_data[:10]: # Check top 10 repos
-            lang = repo.get("language")
-            if lang:
-                languages[lang] = languages.get(lang, 0) + 1
-        
-        top_langs = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:5]
-        
+
+        if isinstance(repo_stats, BaseException):
+            print(f"Repos API Error: {repo_stats}")
+            FETCH_ERRORS.inc("repos")
+            repo_stats = RepoStats()
 
         # Ensure total_commits is always an integer
-        total_commits = 0 
+        if isinstance(total_commits, BaseException):
+            total_commits = 0
 
-        try:
-            contrib_url = f"https://github-contributions-api.jogruber.de/v4/{username}"
-            contrib_resp = requests.get(contrib_url)
-            if contrib_resp.status_code == 200:
-                c_data = contrib_resp.json()
-                if 'total' in c_data and isinstance(c_data['total'], dict):
-                    # Sum all year totals into a single integer
-                    total_commits = sum(c_data['total'].values())
-            # If the response isn't 200, it stays as 0
-        except Exception as ex:
-            print(f"Contrib API Error: {ex}")
-            total_commits = 0 # Safety fallback
-
-        data = {
+        return {
             "username": username,
-            "total_stars": total_stars,
+            "total_stars": repo_stats.total_stars,
             "total_commits": total_commits,
             "public_repos": user_data.get("public_repos", 0),
             "followers": user_data.get("followers", 0),
-            "top_languages": top_langs,
+            "top_languages": repo_stats.top_languages(),
         }
 
-        # --- Optional GraphQL enrichment ---
-        graphql_data = fetch_github_graphql(username)
-        if graphql_data:
-            try:
-                contributions, gql_total_commits = parse_graphql_contributions(graphql_data)
-                data["contributions"] = contributions
-                data["total_commits"] = gql_total_commits
-            except Exception:
-                pass  # Never break REST fallback
-
-        return data
-
-            
     except Exception as e:
         print(f"Error: {e}")
+        FETCH_ERRORS.inc("rest")
         return None
 
 def get_mock_data(username):
@@ -171,9 +698,8 @@ def get_mock_data(username):
         "public_repos": 25,
         "followers": 85,
         "top_languages": [("Python", 10), ("JavaScript", 5), ("Rust", 2)],
-        "contributions":[ 
-            {"date": f"2025-01-{i+1:02d}", "count": (i * 3) % 10}
-            for i in range(80)
-        ]
-
+        # 80 consecutive days from 2025-01-01
+        "contributions": ContributionCalendar(
+            day_number("2025-01-01"), array("H", ((i * 3) % 10 for i in range(80)))
+        ),
     }
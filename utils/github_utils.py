@@ -2,11 +2,12 @@
 GitHub API utilities for fetching profile data
 """
 
-import requests
 from typing import Dict, List, Optional
 from collections import Counter
+from utils import http
+from utils.github_api import GITHUB_API_URL, GITHUB_GRAPHQL_URL
 
-GITHUB_API_BASE = "https://api.github.com"
+GITHUB_API_BASE = GITHUB_API_URL
 
 
 def fetch_github_stats(username: str) -> Optional[Dict]:
@@ -21,9 +22,10 @@ def fetch_github_stats(username: str) -> Optional[Dict]:
     """
     try:
         # Fetch user profile
-        user_response = requests.get(
+        user_response = http.get(
             f"{GITHUB_API_BASE}/users/{username}",
-            headers={"Accept": "application/vnd.github.v3+json"}
+            headers={"Accept": "application/vnd.github.v3+json"},
+            resource="core"
         )
         
         if user_response.status_code != 200:
@@ -33,13 +35,14 @@ def fetch_github_stats(username: str) -> Optional[Dict]:
         user_data = user_response.json()
         
         # Fetch user's repositories
-        repos_response = requests.get(
+        repos_response = http.get(
             f"{GITHUB_API_BASE}/users/{username}/repos",
             params={
                 "per_page": 100,
                 "sort": "updated"
             },
-            headers={"Accept": "application/vnd.github.v3+json"}
+            headers={"Accept": "application/vnd.github.v3+json"},
+            resource="core"
         )
         
         if repos_response.status_code != 200:
@@ -137,8 +140,8 @@ def fetch_github_stats_detailed(username: str, github_token: Optional[str] = Non
     """
     
     try:
-        response = requests.post(
-            "https://api.github.com/graphql",
+        response = http.post(
+            GITHUB_GRAPHQL_URL,
             json={
                 "query": query,
                 "variables": {"username": username}
@@ -206,4 +209,4 @@ if __name__ == "__main__":
         else:
             print("Failed to fetch stats")
     else:
-        print("Usage: python github_utils.py <username>")
+        print("Usage: python -m utils.github_utils <username>")
@@ -0,0 +1,318 @@
+"""
+Shared HTTP plumbing for everything that talks to GitHub
+
+Every GitHub-touching module goes through this file so that all calls get:
+- pooled keep-alive connections (one requests.Session, one httpx.AsyncClient per loop)
+- mandatory connect/read timeouts
+- retries with jittered exponential backoff on 5xx, 429 and secondary rate limits
+- token selection from the rate-limit-aware pool when a `resource`
+  ("core", "graphql") is given
+- optional conditional GETs (If-None-Match / If-Modified-Since) backed by a
+  persisted ETag store, so unchanged resources cost a free 304; callers
+  name the fields they read so only those are kept and stored
+- per-upstream call counts, latencies and in-flight gauges (utils.metrics),
+  and the same latencies in the request's Server-Timing breakdown
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Mapping, NamedTuple, Optional, Sequence
+from urllib.parse import urlencode
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_LATENCY, UPSTREAM_REQUESTS, upstream_name
+from utils.store import ETagStore
+from utils import timing
+from utils.tokens import get_pool
+
+CONNECT_TIMEOUT = float(os.getenv("GITCANVAS_HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("GITCANVAS_HTTP_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("GITCANVAS_HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("GITCANVAS_HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("GITCANVAS_HTTP_BACKOFF_MAX", "8"))
+POOL_SIZE = int(os.getenv("GITCANVAS_HTTP_POOL_SIZE", "20"))
+
+RETRY_STATUSES = {500, 502, 503, 504}
+
+POOL_LIMITS = httpx.Limits(max_connections=POOL_SIZE * 5, max_keepalive_connections=POOL_SIZE)
+
+# One pooled AsyncClient per event loop: httpx connections can't be shared
+# across loops, but every coroutine on the same loop reuses the same pool.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+_session = None
+_session_lock = threading.Lock()
+
+_sync_loop = None
+_sync_loop_lock = threading.Lock()
+
+etag_store = ETagStore()
+
+
+def get_session() -> requests.Session:
+    """Return the shared, pooled requests.Session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the pooled AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=POOL_LIMITS,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="gitcanvas-io", daemon=True).start()
+        return _sync_loop
+
+
+def run_sync(coro):
+    """
+    Run a coroutine from synchronous code (Streamlit, CLI scripts).
+    All sync callers share one background event loop, and therefore one
+    connection pool, instead of paying for a fresh loop and TLS handshakes
+    on every call.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_sync_loop()).result()
+
+
+def retry_delay(status: Optional[int], headers: Optional[Mapping[str, str]], body: str, attempt: int) -> Optional[float]:
+    """
+    Seconds to wait before retrying, or None if the response is final.
+
+    Retries 5xx, 429 and GitHub's secondary rate limits (403 with Retry-After
+    or a "secondary rate limit" message). A primary rate limit (403 with
+    X-RateLimit-Remaining: 0 and no Retry-After) is not retried: it won't
+    clear for up to an hour.
+    """
+    if attempt >= MAX_RETRIES:
+        return None
+    headers = headers or {}
+    retry_after = headers.get("retry-after")
+    if status is not None and status not in RETRY_STATUSES and status != 429:
+        if status != 403:
+            return None
+        if not retry_after and "secondary rate limit" not in (body or "").lower():
+            return None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    # Full jitter: uniform over [0, base * 2^attempt], capped
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _with_token(headers: Optional[Mapping], token: Optional[str]) -> dict:
+    headers = dict(headers or {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _rate_limited(resp) -> bool:
+    """Primary rate limit hit: worth retrying on another token, if any has budget."""
+    return resp.status_code in (403, 429) and resp.headers.get("x-ratelimit-remaining") == "0"
+
+
+def _observe(upstream: str, start: float, status):
+    elapsed = time.perf_counter() - start
+    UPSTREAM_IN_FLIGHT.dec(upstream)
+    UPSTREAM_LATENCY.observe(elapsed, upstream)
+    timing.record(f"upstream-{upstream}", elapsed)
+    UPSTREAM_REQUESTS.inc(upstream, str(status) if status else "error")
+
+
+def request(method: str, url: str, timeout=None, resource: Optional[str] = None, **kwargs) -> requests.Response:
+    """
+    requests-style call on the shared session, with timeouts and retries.
+    With `resource`, the call is authenticated with the pool token that has
+    the most budget left (raising RateLimitExhausted if none has any).
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    session = get_session()
+    pool = get_pool()
+    headers = kwargs.pop("headers", None)
+    upstream = upstream_name(url)
+    attempt = 0
+    while True:
+        token = pool.acquire(resource) if resource else None
+        UPSTREAM_IN_FLIGHT.inc(upstream)
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, url, timeout=timeout, headers=_with_token(headers, token), **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _observe(upstream, start, None)
+            delay = retry_delay(None, None, "", attempt)
+            if delay is None:
+                raise
+        except BaseException:
+            _observe(upstream, start, None)
+            raise
+        else:
+            _observe(upstream, start, resp.status_code)
+            if resource:
+                pool.update(token, resp.headers, resource)
+                if _rate_limited(resp) and attempt < MAX_RETRIES and len(pool.tokens) > 1:
+                    attempt += 1
+                    continue
+            delay = retry_delay(resp.status_code, resp.headers, _peek_body(resp), attempt)
+            if delay is None:
+                return resp
+        time.sleep(delay)
+        attempt += 1
+
+
+async def arequest(method: str, url: str, resource: Optional[str] = None, **kwargs) -> httpx.Response:
+    """Async call on the loop's pooled client, with timeouts, retries and token selection."""
+    client = get_async_client()
+    pool = get_pool()
+    headers = kwargs.pop("headers", None)
+    upstream = upstream_name(url)
+    attempt = 0
+    while True:
+        token = await pool.aacquire(resource) if resource else None
+        UPSTREAM_IN_FLIGHT.inc(upstream)
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, headers=_with_token(headers, token), **kwargs)
+        except httpx.TransportError:
+            _observe(upstream, start, None)
+            delay = retry_delay(None, None, "", attempt)
+            if delay is None:
+                raise
+        except BaseException:
+            _observe(upstream, start, None)
+            raise
+        else:
+            _observe(upstream, start, resp.status_code)
+            if resource:
+                pool.update(token, resp.headers, resource)
+                if _rate_limited(resp) and attempt < MAX_RETRIES and len(pool.tokens) > 1:
+                    attempt += 1
+                    continue
+            delay = retry_delay(resp.status_code, resp.headers, _peek_body(resp), attempt)
+            if delay is None:
+                return resp
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def _peek_body(resp) -> str:
+    # Only 403s need the body, to tell secondary rate limits from other errors
+    if resp.status_code != 403:
+        return ""
+    try:
+        return resp.text[:500]
+    except Exception:
+        return ""
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs) -> httpx.Response:
+    return await arequest("POST", url, **kwargs)
+
+
+class JSONResult(NamedTuple):
+    """Outcome of aget_json. `not_modified` is True when served from a 304."""
+    status: int
+    data: Any
+    link: Optional[str]
+    not_modified: bool = False
+
+
+def _validator_key(url: str, params: Optional[Mapping], fields: Optional[Sequence[str]] = None) -> str:
+    # Keyed by URL only: GitHub's ETags vary with Authorization, so a 304 is
+    # only ever returned when the requester's own representation matches.
+    key = url + "?" + urlencode(sorted(params.items())) if params else url
+    # A stored projection only serves callers that read the same fields
+    return key + "#" + ",".join(fields) if fields is not None else key
+
+
+def _conditional_headers(headers: Optional[Mapping], stored) -> dict:
+    headers = dict(headers or {})
+    if stored:
+        etag, last_modified, _, _ = stored
+        if etag:
+            headers["If-None-Match"] = etag
+        elif last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def project(data: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Keep only `fields` of a JSON object, or of each object in a JSON array."""
+    if fields is None:
+        return data
+    if isinstance(data, list):
+        return [project(item, fields) for item in data]
+    if isinstance(data, dict):
+        return {name: data[name] for name in fields if name in data}
+    return data
+
+
+def _json_result(resp, key: str, stored, conditional: bool, fields: Optional[Sequence[str]]) -> JSONResult:
+    if resp.status_code == 304 and stored:
+        with timing.span("etag-store"):
+            etag_store.touch(key)
+        return JSONResult(200, stored[3], stored[2], not_modified=True)
+    if resp.status_code != 200:
+        return JSONResult(resp.status_code, None, resp.headers.get("link"))
+    data = project(resp.json(), fields)
+    etag = resp.headers.get("etag")
+    last_modified = resp.headers.get("last-modified")
+    if conditional and (etag or last_modified):
+        with timing.span("etag-store"):
+            etag_store.put(key, etag, last_modified, resp.headers.get("link"), data)
+    return JSONResult(200, data, resp.headers.get("link"))
+
+
+async def aget_json(url: str, headers: Optional[Mapping] = None, params: Optional[Mapping] = None,
+                    conditional: bool = True, fields: Optional[Sequence[str]] = None, **kwargs) -> JSONResult:
+    """
+    GET a JSON document, revalidating against the ETag store when `conditional`.
+    With `fields`, only those keys of the object (or of each object in an
+    array) are returned and stored, e.g. the two a repo page is read for.
+    """
+    key = _validator_key(url, params, fields)
+    with timing.span("etag-store"):
+        # A database read: keep it off the event loop
+        stored = await asyncio.to_thread(etag_store.get, key) if conditional else None
+    resp = await arequest("GET", url, headers=_conditional_headers(headers, stored), params=params, **kwargs)
+    return _json_result(resp, key, stored, conditional, fields)
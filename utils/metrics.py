@@ -0,0 +1,233 @@
+"""
+Prometheus-style metrics, rendered in the text exposition format
+
+Hand-rolled rather than pulling in prometheus_client: the hot path is one
+dict lookup and an integer add under an uncontended lock, and values that
+already live elsewhere (cache counters, rate-limit budgets) are read by
+collectors at scrape time instead of being duplicated on every request.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Seconds; covers sub-millisecond cache hits up to slow multi-page GitHub fetches
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        # Per-bucket (non-cumulative) counts; the +Inf slot is the last one
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self._values.items()]
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# A collector returns (name, kind, help, [(labels dict, value), ...]) tuples at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[dict, float]]]]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.header() + metric.render()
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Inbound API traffic
+REQUEST_LATENCY = REGISTRY.histogram(
+    "gitcanvas_request_duration_seconds", "API request latency by route and theme.", ("route", "theme"))
+REQUESTS = REGISTRY.counter(
+    "gitcanvas_requests_total", "API requests by route and status code.", ("route", "status"))
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "gitcanvas_requests_in_flight", "API requests currently being served.")
+
+# Outbound calls, labelled by upstream (host, with GraphQL split out from REST)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "gitcanvas_upstream_duration_seconds", "Upstream call latency per attempt.", ("upstream",))
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "gitcanvas_upstream_requests_total", "Upstream call attempts by status ('error' for transport failures).",
+    ("upstream", "status"))
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge(
+    "gitcanvas_upstream_in_flight", "Upstream calls currently waiting on a response.", ("upstream",))
+FETCH_ERRORS = REGISTRY.counter(
+    "gitcanvas_fetch_errors_total", "Profile data fetches that failed or fell back, by source.", ("source",))
+
+
+def upstream_name(url: str) -> str:
+    """'api.github.com', 'api.github.com/graphql' or the bare host of any other upstream."""
+    parts = urlsplit(str(url))
+    if parts.path.rstrip("/").endswith("/graphql"):
+        return parts.netloc + "/graphql"
+    return parts.netloc
+
+
+# What a card endpoint renders when the request has no `theme`
+DEFAULT_THEME = "Default"
+
+
+def _takes_theme(route) -> bool:
+    """Whether a matched route has a `theme` query parameter (the card endpoints)."""
+    dependant = getattr(route, "dependant", None)
+    return dependant is not None and any(param.name == "theme" for param in dependant.query_params)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every request against its route template
+    (not the raw path, which would explode label cardinality) and the
+    `theme` query parameter, mapped through `theme_label` (requests to a
+    themed route without one count as DEFAULT_THEME; other routes get "").
+    """
+
+    def __init__(self, app, theme_label: Callable[[str], str] = lambda theme: theme):
+        self.app = app
+        self.theme_label = theme_label
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            theme = ""
+            values = None
+            if b"theme=" in scope.get("query_string", b""):
+                values = parse_qs(scope["query_string"].decode("latin-1")).get("theme")
+            if values or _takes_theme(route):
+                # No theme parameter renders the default theme, so it is labelled as one
+                theme = self.theme_label(values[0] if values else DEFAULT_THEME)
+            REQUEST_LATENCY.observe(elapsed, path, theme)
+            REQUESTS.inc(path, str(status[0]))
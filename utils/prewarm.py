@@ -0,0 +1,197 @@
+"""
+Background pre-warming of frequently requested profiles
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils import github_api, timing
+from utils.cache import TTLCache, normalize_username
+from utils.metrics import upstream_name
+from utils.tokens import get_pool
+
+PREWARM_ENABLED = os.getenv("GITCANVAS_PREWARM_ENABLED", "1") == "1"
+PREWARM_INTERVAL = float(os.getenv("GITCANVAS_PREWARM_INTERVAL", "30"))
+PREWARM_TOP_K = int(os.getenv("GITCANVAS_PREWARM_TOP_K", "50"))
+# Refresh entries that expire within this many seconds
+PREWARM_HORIZON = float(os.getenv("GITCANVAS_PREWARM_HORIZON", "60"))
+# Share of the hourly rate-limit budget pre-warming may spend
+PREWARM_BUDGET_SHARE = float(os.getenv("GITCANVAS_PREWARM_BUDGET_SHARE", "0.1"))
+# Half-life of the access counters, in seconds
+PREWARM_HALF_LIFE = float(os.getenv("GITCANVAS_PREWARM_HALF_LIFE", "3600"))
+
+# Upstream whose calls count against the rate-limit budget (REST and GraphQL,
+# which timing records as "<host>/graphql"); follows GITHUB_API_URL overrides
+GITHUB_UPSTREAM = f"upstream-{upstream_name(github_api.GITHUB_API_URL)}"
+
+
+def github_calls(timings: timing.Timings) -> int:
+    """GitHub API calls (retries included) recorded in `timings`."""
+    return sum(count for name, (_, count) in timings.phases.items() if name.startswith(GITHUB_UPSTREAM))
+
+
+class AccessTracker:
+    """
+    Exponentially decayed request counter per username.
+    A hit adds 1; scores halve every `half_life` seconds, so the ranking
+    follows what is popular now rather than what was popular last week.
+    """
+
+    def __init__(self, half_life: float = PREWARM_HALF_LIFE, max_tracked: int = 10_000):
+        self.decay = math.log(2) / half_life
+        self.max_tracked = max_tracked
+        self._scores: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _score_at(self, score: float, stamp: float, now: float) -> float:
+        return score * math.exp(-self.decay * (now - stamp))
+
+    def record(self, username: str):
+        key = normalize_username(username)
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            score, stamp = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._score_at(score, stamp, now) + 1.0, now)
+            if len(self._scores) > self.max_tracked:
+                self._prune(now)
+
+    def _prune(self, now: float):
+        # Keep the busier half
+        ranked = sorted(self._scores.items(), key=lambda kv: self._score_at(kv[1][0], kv[1][1], now), reverse=True)
+        self._scores = dict(ranked[: self.max_tracked // 2])
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            scored = [(key, self._score_at(s, t, now)) for key, (s, t) in self._scores.items()]
+        scored.sort(key=lambda kv: kv[1], reverse=True)
+        return scored[:k]
+
+
+class Prewarmer:
+    """
+    Periodically re-fetches the top-K most requested users shortly before
+    their profile cache entries expire, most urgent (stalest) first. Only
+    cached profiles are refreshed: live traffic fetches missing ones, and a
+    refresh that fails (e.g. the user no longer exists) isn't retried for
+    one cache TTL.
+
+    Spends at most `budget_share` of the pool's hourly rate limit, counting
+    every GitHub call a refresh makes, and stops early in a round if the
+    pool's headroom drops below what real traffic needs, so pre-warming
+    never starves live requests.
+    """
+
+    def __init__(self, cache: TTLCache, refresh: Callable[[str], Awaitable[Optional[dict]]],
+                 tracker: Optional[AccessTracker] = None, top_k: int = PREWARM_TOP_K,
+                 horizon: float = PREWARM_HORIZON, interval: float = PREWARM_INTERVAL,
+                 budget_share: float = PREWARM_BUDGET_SHARE, resource: Optional[str] = None):
+        self.cache = cache
+        self.refresh = refresh
+        self.tracker = tracker or AccessTracker()
+        self.top_k = top_k
+        self.horizon = horizon
+        self.interval = interval
+        self.budget_share = budget_share
+        self.resource = resource
+        # (time, GitHub calls) per refresh in the last hour
+        self._spent = deque()
+        self._spent_total = 0
+        # Username -> time before which a failed refresh isn't retried
+        self._failed: Dict[str, float] = {}
+        self._task = None
+        self.refreshed = 0
+        self.skipped_for_budget = 0
+
+    def record(self, username: str):
+        self.tracker.record(username)
+
+    def due(self) -> List[str]:
+        """Hot cached users whose entries expire within the horizon, stalest first."""
+        now = time.time()
+        due = []
+        for key, _score in self.tracker.top(self.top_k):
+            if self._failed.get(key, 0) > now:
+                continue
+            remaining = self.cache.expires_in(key)
+            if remaining is not None and remaining <= self.horizon:
+                due.append((remaining, key))
+        due.sort()
+        return [key for _, key in due]
+
+    def _within_budget(self) -> bool:
+        pool = get_pool()
+        # Profiles come from GraphQL when there is a token, REST otherwise
+        resource = self.resource or ("graphql" if pool.authenticated else "core")
+        now = time.time()
+        while self._spent and now - self._spent[0][0] > 3600:
+            self._spent_total -= self._spent.popleft()[1]
+        if self._spent_total >= self.budget_share * pool.total_limit(resource):
+            return False
+        # Leave the rest of the budget to live traffic
+        return pool.headroom(resource) > self.budget_share
+
+    async def run_once(self) -> int:
+        count = 0
+        for key in self.due():
+            if not self._within_budget():
+                self.skipped_for_budget += 1
+                break
+            data = None
+            with timing.collect() as timings:
+                try:
+                    data = await self.refresh(key)
+                except Exception as e:
+                    print(f"Prewarm failed for {key}: {e}")
+            cost = github_calls(timings)
+            self._spent.append((time.time(), cost))
+            self._spent_total += cost
+            if data is not None:
+                count += 1
+                self._failed.pop(key, None)
+            else:
+                self._failed[key] = time.time() + self.cache.ttl
+        self.refreshed += count
+        now = time.time()
+        self._failed = {key: until for key, until in self._failed.items() if until > now}
+        return count
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"Prewarm round failed: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self.tracker),
+            "refreshed": self.refreshed,
+            "skipped_for_budget": self.skipped_for_budget,
+            "spent_last_hour": self._spent_total,
+            "backing_off": len(self._failed),
+        }
@@ -0,0 +1,187 @@
+"""
+Rendered-card response cache for the API
+"""
+
+import gzip
+import hashlib
+import os
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from utils.cache import TTLCache
+try:
+    import brotli  # type: ignore
+    _HAS_BROTLI = True
+except Exception:
+    brotli = None
+    _HAS_BROTLI = False
+
+RESPONSE_TTL = float(os.getenv("GITCANVAS_RESPONSE_TTL", "300"))
+RESPONSE_STALE_TTL = float(os.getenv("GITCANVAS_RESPONSE_STALE_TTL", "3600"))
+RESPONSE_CACHE_BYTES = int(os.getenv("GITCANVAS_RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Bodies smaller than this are sent uncompressed: the saving doesn't pay for the headers and CPU
+COMPRESS_MIN_BYTES = int(os.getenv("GITCANVAS_COMPRESS_MIN_BYTES", "1024"))
+# Compressed on the event loop at first use, so favor speed over the last few bytes
+GZIP_LEVEL = int(os.getenv("GITCANVAS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("GITCANVAS_BROTLI_QUALITY", "5"))
+
+# Preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip") if _HAS_BROTLI else ("gzip",)
+
+# What a render function returns: the SVG text, or (text, cacheable)
+Rendered = Union[str, Tuple[str, bool]]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output (and its ETag) identical across renders
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CachedResponse:
+    """
+    A rendered body plus its strong, content-hash ETag. A gzip or brotli
+    variant is compressed the first time a client negotiates it and kept
+    for later hits. `cacheable=False` marks a body that must not be stored
+    anywhere (drawn from placeholder data); its variants aren't kept either.
+    """
+
+    __slots__ = ("body", "media_type", "etag", "encodings", "encoded", "cacheable")
+
+    def __init__(self, body: bytes, media_type: str = "image/svg+xml", cacheable: bool = True):
+        self.body = body
+        self.media_type = media_type
+        self.cacheable = cacheable
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # Encodings that may be offered; one that turns out no smaller is dropped
+        self.encodings = ENCODINGS if len(body) >= COMPRESS_MIN_BYTES else ()
+        self.encoded: Dict[str, bytes] = {}
+
+    def __len__(self):
+        # Weighed by the identity body only: the weight must not change while the
+        # entry is cached, and the compressed variants are a fraction of it
+        return len(self.body)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """Each content-coding is a different representation, so it gets its own ETag."""
+        if encoding is None:
+            return self.etag
+        return self.etag[:-1] + "-" + encoding + '"'
+
+    def variant(self, encoding: str) -> Optional[bytes]:
+        """The body compressed with `encoding`, or None if that isn't smaller."""
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = compress(self.body, encoding)
+            if len(data) >= len(self.body):
+                self.encodings = tuple(e for e in self.encodings if e != encoding)
+                return None
+            if self.cacheable:
+                self.encoded[encoding] = data
+        return data
+
+    def representation(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str], str]:
+        """(body, content-encoding or None, etag) for the client's Accept-Encoding."""
+        encoding = negotiate_encoding(accept_encoding, self.encodings)
+        data = self.variant(encoding) if encoding else None
+        if data is None:
+            return self.body, None, self.etag
+        return data, encoding, self.etag_for(encoding)
+
+    def etags(self):
+        """The ETags of every representation of this body."""
+        return [self.etag] + [self.etag_for(encoding) for encoding in self.encodings]
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available) -> Optional[str]:
+    """
+    Best of `available` content-codings for an Accept-Encoding header,
+    honoring q-values (q=0 refuses). None means send the identity body.
+    """
+    if not accept_encoding or not available:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def make_key(endpoint: str, username: str, theme: str, colors: Optional[dict] = None, **options) -> tuple:
+    """
+    Canonical cache key for a card request: lower-cased username, the theme,
+    sorted color overrides and sorted options (lists are sorted as well).
+    """
+    opts = []
+    for name, value in sorted(options.items()):
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(v.lower() for v in value))
+        opts.append((name, value))
+    return (
+        endpoint,
+        (username or "").strip().lower(),
+        theme,
+        tuple(sorted((colors or {}).items())),
+        tuple(opts),
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _response(rendered: Rendered, media_type: str) -> CachedResponse:
+    text, cacheable = rendered if isinstance(rendered, tuple) else (rendered, True)
+    return CachedResponse(text.encode("utf-8"), media_type, cacheable)
+
+
+class ResponseCache(TTLCache):
+    """
+    TTLCache of CachedResponse objects bounded by total body bytes.
+    Uncacheable responses are returned but never stored; a stale entry
+    stays in place rather than being replaced by one.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES, ttl: float = RESPONSE_TTL,
+                 stale_ttl: float = RESPONSE_STALE_TTL, maxsize: int = 100_000):
+        super().__init__(maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl, weigher=len, max_weight=max_bytes)
+
+    def set(self, key, value, delta: float = 0.0, ttl: Optional[float] = None):
+        if value.cacheable:
+            super().set(key, value, delta=delta, ttl=ttl)
+
+    async def afetch_rendered(self, key: tuple, render: Callable[[], Awaitable[Rendered]],
+                              media_type: str = "image/svg+xml") -> Tuple[CachedResponse, str]:
+        """
+        Return (CachedResponse, state), rendering on a miss or in the background
+        when stale. `render` is a coroutine function returning the SVG text, or
+        (text, cacheable).
+        """
+        async def load():
+            return _response(await render(), media_type)
+        return await self.afetch(key, load)
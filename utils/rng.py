@@ -0,0 +1,32 @@
+"""
+Seeded randomness for the renderers
+
+The card and theme art layouts are randomized, but the same input must give
+byte-identical SVG so ETags, CDN caches and the response cache hold. Every
+renderer draws from its own random.Random seeded by the username and the
+contribution data it lays out, never from the global `random` state.
+"""
+
+import hashlib
+import random
+import sys
+from array import array
+
+from utils.cache import normalize_username
+from utils.contributions import as_calendar
+
+
+def render_seed(username, contributions=None) -> int:
+    """64-bit seed from the (case-insensitive) username and the contribution calendar."""
+    calendar = as_calendar(contributions)
+    counts = array("H", calendar.counts)
+    if sys.byteorder != "little":
+        counts.byteswap()
+    digest = hashlib.sha256(f"{normalize_username(username)}\n{calendar.start}\n".encode("utf-8"))
+    digest.update(counts.tobytes())
+    return int.from_bytes(digest.digest()[:8], "big")
+
+
+def seeded_rng(data) -> random.Random:
+    """Random instance for rendering a profile dict (uses 'username' and 'contributions')."""
+    return random.Random(render_seed(data.get("username"), data.get("contributions")))
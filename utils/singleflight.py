@@ -0,0 +1,63 @@
+"""
+Request coalescing: concurrent callers for the same key share one upstream call
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key (Go's singleflight).
+
+    While a call for `key` is in flight, further callers wait for it and get
+    the same result, or the same exception, instead of starting their own.
+    Nothing is cached once the call finishes; pair it with a TTLCache for that.
+
+    Counters:
+    - calls: every ado() invocation
+    - executions: calls that actually ran the function
+    - deduplicated: calls that were served by someone else's execution
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._lock = threading.Lock()
+        # Futures belong to one event loop, so in-flight tasks are tracked per loop
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await `fn()` for `key`, joining an in-flight call on this loop if any.
+        The shared call runs as its own task, so one caller being cancelled
+        doesn't cancel it for everyone else.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.calls += 1
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = loop.create_task(fn())
+                tasks[key] = task
+                task.add_done_callback(lambda _t: tasks.pop(key, None))
+                self.executions += 1
+            else:
+                self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return sum(len(t) for t in self._tasks.values())
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "in_flight": self.in_flight(),
+        }
@@ -0,0 +1,95 @@
+"""
+Uniform-grid spatial index for the Neural renderers
+
+Points are bucketed into square cells, so a nearest-neighbor query only
+looks at the cells around the query point, expanding ring by ring until
+no unvisited cell can hold anything closer. Building the index is O(n) and
+connecting every node to its k nearest neighbors is about O(n * k) for
+evenly spread points, instead of comparing every pair.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+class GridIndex:
+    """Points bucketed by (floor(x / cell_size), floor(y / cell_size))."""
+
+    def __init__(self, points: Sequence[Point], cell_size: float):
+        self.points = points
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for index, (x, y) in enumerate(points):
+            self.cells[self._cell(x, y)].append(index)
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _ring(self, cx, cy, ring):
+        """Indices of the points in the cells exactly `ring` cells away (Chebyshev) from (cx, cy)."""
+        cells = self.cells
+        if ring == 0:
+            yield from cells.get((cx, cy), ())
+            return
+        for dx in range(-ring, ring + 1):
+            yield from cells.get((cx + dx, cy - ring), ())
+            yield from cells.get((cx + dx, cy + ring), ())
+        for dy in range(-ring + 1, ring):
+            yield from cells.get((cx - ring, cy + dy), ())
+            yield from cells.get((cx + ring, cy + dy), ())
+
+    def nearest(self, index: int, k: int, radius: float) -> List[Tuple[float, int]]:
+        """
+        Up to `k` other points closer than `radius` to point `index`, as
+        (distance, index) pairs, nearest first (ties broken by index).
+        """
+        points = self.points
+        cell = self.cell_size
+        x, y = points[index]
+        cx, cy = self._cell(x, y)
+        radius_sq = radius * radius
+        found = []
+        max_ring = math.ceil(radius / cell)
+        for ring in range(max_ring + 1):
+            if len(found) >= k:
+                # Distance from (x, y) to the edge of the block of rings already searched;
+                # nothing unvisited is closer than that
+                edge = min(x - (cx - ring + 1) * cell, (cx + ring) * cell - x,
+                           y - (cy - ring + 1) * cell, (cy + ring) * cell - y)
+                if found[k - 1][0] <= edge * edge:
+                    break
+            for other in self._ring(cx, cy, ring):
+                if other == index:
+                    continue
+                ox, oy = points[other]
+                dist_sq = (ox - x) ** 2 + (oy - y) ** 2
+                if dist_sq < radius_sq:
+                    found.append((dist_sq, other))
+            found.sort()
+        return [(math.sqrt(dist_sq), other) for dist_sq, other in found[:k]]
+
+
+def nearest_edges(points: Sequence[Point], k: int, radius: float,
+                  cell_size: Optional[float] = None) -> List[Tuple[int, int]]:
+    """
+    Connect every point to its `k` nearest neighbors within `radius`.
+    Returns the distinct (i, j) pairs with i < j, sorted, so the result only
+    depends on the points.
+    """
+    if len(points) < 2 or k <= 0:
+        return []
+    if cell_size is None:
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+        # About one point per cell over the bounding box, never wider than the search radius
+        cell_size = min(radius, max(math.sqrt(area / len(points)), 1.0))
+    grid = GridIndex(points, cell_size)
+    edges = set()
+    for i in range(len(points)):
+        for _, j in grid.nearest(i, k, radius):
+            edges.add((i, j) if i < j else (j, i))
+    return sorted(edges)
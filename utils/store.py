@@ -0,0 +1,343 @@
+"""
+SQLite-backed persistent stores that survive process restarts
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from utils.contributions import ContributionCalendar, as_calendar
+
+DB_PATH = os.getenv("GITCANVAS_DB_PATH", os.path.join(".gitcanvas", "gitcanvas.db"))
+ETAG_STORE_MAX_ROWS = int(os.getenv("GITCANVAS_ETAG_STORE_MAX_ROWS", "50000"))
+STORE_BATCH_SIZE = int(os.getenv("GITCANVAS_STORE_BATCH_SIZE", "50"))
+STORE_FLUSH_INTERVAL = float(os.getenv("GITCANVAS_STORE_FLUSH_INTERVAL", "2"))
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    """Open (creating if needed) the shared database file."""
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class _BatchedStore:
+    """
+    Base for stores whose writes are queued and flushed in one transaction
+    per batch by a writer thread (every `batch_size` records or
+    `flush_interval` seconds, and at exit), so the request path never waits
+    on disk.
+
+    `_lock` only guards the in-memory queue: a flush swaps the queue out
+    under it and writes the batch without it, and reads check the queue and
+    the batch being written before going to the database on their own
+    connection, so neither waits for a commit.
+    """
+
+    writer_name = "store-writer"
+
+    def __init__(self, path: str, batch_size: int, flush_interval: float):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = None
+        self._reader = None
+        self._lock = threading.Lock()
+        # One flush (and one user of each connection) at a time
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._flushing = None
+        self._wake = threading.Event()
+        self._writer = None
+
+    def _create_tables(self, db: sqlite3.Connection):
+        raise NotImplementedError
+
+    def _db(self) -> sqlite3.Connection:
+        """The write connection (used with `_write_lock` held)."""
+        if self._conn is None:
+            self._conn = connect(self.path)
+            self._create_tables(self._conn)
+        return self._conn
+
+    def _read(self, sql: str, params: tuple):
+        """First row of a query, on the read connection (WAL lets it run during a write)."""
+        if self.path == ":memory:":
+            # Every connection to :memory: is its own database
+            with self._write_lock:
+                return self._db().execute(sql, params).fetchone()
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = connect(self.path)
+                self._create_tables(self._reader)
+            return self._reader.execute(sql, params).fetchone()
+
+    def _queued(self) -> int:
+        """Number of queued records (called with `_lock` held)."""
+        raise NotImplementedError
+
+    def _take_queued(self):
+        """Return the queue as a batch and start an empty one (called with `_lock` held)."""
+        raise NotImplementedError
+
+    def _write_batch(self, db: sqlite3.Connection, batch):
+        """Write a batch inside the flush transaction."""
+        raise NotImplementedError
+
+    def _requeue(self, batch):
+        """Put back a batch that failed to commit, under newer queued records (called with `_lock` held)."""
+        raise NotImplementedError
+
+    def _queue(self, add):
+        """Run `add()` to queue a record, then start or wake the writer as needed."""
+        with self._lock:
+            add()
+            queued = self._queued()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name=self.writer_name, daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        if queued >= self.batch_size:
+            self._wake.set()
+
+    def _run_writer(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"{type(self).__name__} flush failed: {e}")
+
+    def flush(self):
+        """Write all queued records in a single transaction."""
+        with self._write_lock:
+            with self._lock:
+                if not self._queued():
+                    return
+                batch = self._flushing = self._take_queued()
+            db = self._db()
+            try:
+                db.execute("BEGIN")
+                try:
+                    self._write_batch(db, batch)
+                    db.execute("COMMIT")
+                except Exception:
+                    db.execute("ROLLBACK")
+                    with self._lock:
+                        self._requeue(batch)
+                    raise
+            finally:
+                with self._lock:
+                    self._flushing = None
+
+
+class ETagStore(_BatchedStore):
+    """
+    Validators (ETag / Last-Modified) and the parsed payload per request key.
+
+    Lets the HTTP client send If-None-Match / If-Modified-Since and reuse the
+    stored payload on a 304, which doesn't count against GitHub's rate limit.
+    Writes (and revalidation touches) go through the batched writer, and
+    payloads are serialized there, off the event loop.
+    """
+
+    writer_name = "etag-store-writer"
+
+    def __init__(self, path: str = DB_PATH, max_rows: int = ETAG_STORE_MAX_ROWS,
+                 batch_size: int = STORE_BATCH_SIZE, flush_interval: float = STORE_FLUSH_INTERVAL):
+        super().__init__(path, batch_size, flush_interval)
+        self.max_rows = max_rows
+        self._pending: Dict[str, tuple] = {}
+        self._touched: Dict[str, float] = {}
+        self._since_prune = 0
+
+    def _create_tables(self, db):
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS http_validators (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                link TEXT,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, key: str) -> Optional[Tuple[Optional[str], Optional[str], Optional[str], Any]]:
+        """Return (etag, last_modified, link, payload) or None. Reads the database; call it off the event loop."""
+        with self._lock:
+            record = self._pending.get(key)
+            if record is None and self._flushing is not None:
+                record = self._flushing[0].get(key)
+        if record is not None:
+            return record[:4]
+        row = self._read("SELECT etag, last_modified, link, payload FROM http_validators WHERE key = ?", (key,))
+        if row is None:
+            return None
+        etag, last_modified, link, payload = row
+        return etag, last_modified, link, json.loads(payload)
+
+    def put(self, key: str, etag: Optional[str], last_modified: Optional[str], link: Optional[str], payload: Any):
+        def add():
+            self._touched.pop(key, None)
+            self._pending[key] = (etag, last_modified, link, payload, time.time())
+        self._queue(add)
+
+    def touch(self, key: str):
+        """Mark a record as recently revalidated so pruning keeps it."""
+        def add():
+            record = self._pending.get(key)
+            if record is not None:
+                self._pending[key] = record[:4] + (time.time(),)
+            else:
+                self._touched[key] = time.time()
+        self._queue(add)
+
+    def _queued(self) -> int:
+        return len(self._pending) + len(self._touched)
+
+    def _take_queued(self):
+        batch = (self._pending, self._touched)
+        self._pending, self._touched = {}, {}
+        return batch
+
+    def _write_batch(self, db, batch):
+        pending, touched = batch
+        db.executemany(
+            "INSERT OR REPLACE INTO http_validators (key, etag, last_modified, link, payload, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (key, etag, last_modified, link, json.dumps(payload, separators=(",", ":")), updated_at)
+                for key, (etag, last_modified, link, payload, updated_at) in pending.items()
+            ],
+        )
+        db.executemany(
+            "UPDATE http_validators SET updated_at = ? WHERE key = ?",
+            [(updated_at, key) for key, updated_at in touched.items()],
+        )
+        self._since_prune += len(pending)
+        if self._since_prune >= 500:
+            self._since_prune = 0
+            self._prune(db)
+
+    def _requeue(self, batch):
+        pending, touched = batch
+        self._pending = {**pending, **self._pending}
+        self._touched = {**touched, **self._touched}
+
+    def _prune(self, db):
+        db.execute(
+            "DELETE FROM http_validators WHERE key IN ("
+            " SELECT key FROM http_validators ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def clear(self):
+        with self._write_lock:
+            with self._lock:
+                self._pending, self._touched = {}, {}
+            self._db().execute("DELETE FROM http_validators")
+
+
+class ProfileStore(_BatchedStore):
+    """
+    Last known profile data, contribution calendar and activity feed per user,
+    each with the time it was fetched from GitHub.
+
+    Writes go through the batched writer; reads see queued writes immediately.
+    """
+
+    TABLES = ("profiles", "contributions", "events")
+    writer_name = "profile-store-writer"
+
+    def __init__(self, path: str = DB_PATH, batch_size: int = STORE_BATCH_SIZE,
+                 flush_interval: float = STORE_FLUSH_INTERVAL):
+        super().__init__(path, batch_size, flush_interval)
+        self._pending: Dict[str, Dict[str, Tuple[str, float]]] = {t: {} for t in self.TABLES}
+
+    def _create_tables(self, db):
+        for table in self.TABLES:
+            db.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    username TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+
+    def _put(self, table: str, username: str, payload: Any, fetched_at: Optional[float]):
+        record = (json.dumps(payload, separators=(",", ":")), fetched_at or time.time())
+
+        def add():
+            self._pending[table][username] = record
+        self._queue(add)
+
+    def _get(self, table: str, username: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            record = self._pending[table].get(username)
+            if record is None and self._flushing is not None:
+                record = self._flushing[table].get(username)
+        if record is None:
+            record = self._read(f"SELECT payload, fetched_at FROM {table} WHERE username = ?", (username,))
+        if record is None:
+            return None
+        return json.loads(record[0]), record[1]
+
+    def _queued(self) -> int:
+        return sum(len(p) for p in self._pending.values())
+
+    def _take_queued(self):
+        batch = self._pending
+        self._pending = {t: {} for t in self.TABLES}
+        return batch
+
+    def _write_batch(self, db, batch):
+        for table, records in batch.items():
+            if records:
+                db.executemany(
+                    f"INSERT OR REPLACE INTO {table} (username, payload, fetched_at) VALUES (?, ?, ?)",
+                    [(username, payload, fetched_at) for username, (payload, fetched_at) in records.items()],
+                )
+
+    def _requeue(self, batch):
+        for table, records in batch.items():
+            self._pending[table] = {**records, **self._pending[table]}
+
+    def save_profile(self, username: str, data: dict, fetched_at: Optional[float] = None):
+        """Store a profile dict; its contribution calendar goes to its own table."""
+        profile = {k: v for k, v in data.items() if k != "contributions"}
+        self._put("profiles", username, profile, fetched_at)
+        if data.get("contributions") is not None:
+            self._put("contributions", username, as_calendar(data["contributions"]).to_json(), fetched_at)
+
+    def load_profile(self, username: str) -> Optional[Tuple[dict, float]]:
+        """Return (profile dict, fetched_at) or None."""
+        found = self._get("profiles", username)
+        if found is None:
+            return None
+        profile, fetched_at = found
+        profile["top_languages"] = [tuple(item) for item in profile.get("top_languages", [])]
+        contributions = self._get("contributions", username)
+        if contributions is not None:
+            # Rows written before ContributionCalendar hold a list of day dicts
+            profile["contributions"] = ContributionCalendar.from_json(contributions[0])
+        return profile, fetched_at
+
+    def save_events(self, username: str, feed: dict, fetched_at: Optional[float] = None):
+        """Store a user's recent-activity feed (see github_api.get_recent_activity_async)."""
+        self._put("events", username, feed, fetched_at)
+
+    def load_events(self, username: str) -> Optional[Tuple[Any, float]]:
+        """Return (feed, fetched_at) or None."""
+        return self._get("events", username)
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,148 @@
+"""
+Per-request timing breakdown, reported in the Server-Timing header
+
+Code marks phases with `span(name)`; the time lands in the Timings object of
+the request being served (found through a context variable, so it follows
+the request into tasks and asyncio.to_thread). Spans report self time: an
+enclosing span excludes the time of spans nested in it, so "draw" doesn't
+double count "serialize". Outside a request every call is a cheap no-op.
+"""
+
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+# Log requests slower than this many milliseconds with their breakdown (0 = off)
+SLOW_REQUEST_MS = float(os.getenv("GITCANVAS_SLOW_REQUEST_MS", "0"))
+
+_timings: ContextVar[Optional["Timings"]] = ContextVar("gitcanvas_timings", default=None)
+# Child-time accumulator of the innermost open span
+_parent: ContextVar[Optional[List[float]]] = ContextVar("gitcanvas_timing_parent", default=None)
+
+_INVALID_TOKEN_CHARS = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+
+class Timings:
+    """Summed duration and count per phase name for one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [max(seconds, 0.0), 1]
+        else:
+            phase[0] += max(seconds, 0.0)
+            phase[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def header(self) -> str:
+        """Server-Timing value, e.g. 'draw;dur=1.2, serialize;dur=0.4, total;dur=2.0'."""
+        parts = []
+        for name, (seconds, count) in list(self.phases.items()):
+            entry = f"{_INVALID_TOKEN_CHARS.sub('-', name)};dur={seconds * 1000:.2f}"
+            if count > 1:
+                entry += f';desc="x{count}"'
+            parts.append(entry)
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def current() -> Optional[Timings]:
+    return _timings.get()
+
+
+def record(name: str, seconds: float):
+    """Add an externally measured duration (e.g. an upstream call) to the current request."""
+    timings = _timings.get()
+    if timings is None:
+        return
+    timings.add(name, seconds)
+    parent = _parent.get()
+    if parent is not None:
+        parent[0] += seconds
+
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block as phase `name` of the current request."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    children = [0.0]
+    token = _parent.set(children)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _parent.reset(token)
+        # Concurrent children can sum to more than the wall time; add() clamps at 0
+        timings.add(name, elapsed - children[0])
+        parent = _parent.get()
+        if parent is not None:
+            parent[0] += elapsed
+
+
+@contextmanager
+def collect():
+    """Collect the timings of the enclosed block (and tasks it starts) into a fresh Timings."""
+    timings = Timings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def serialize(dwg) -> str:
+    """dwg.tostring(), timed as the "serialize" phase."""
+    with span("serialize"):
+        return dwg.tostring()
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that collects a Timings per HTTP request, adds the
+    Server-Timing header to the response, and logs the breakdown of requests
+    slower than `slow_ms` (GITCANVAS_SLOW_REQUEST_MS).
+    """
+
+    def __init__(self, app, slow_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = Timings()
+        token = _timings.set(timings)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timings.header().encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+            total_ms = timings.elapsed() * 1000
+            if self.slow_ms and total_ms >= self.slow_ms:
+                # Never log credentials passed as query parameters (/api/recent?token=)
+                query = urlencode([
+                    (k, v) for k, v in parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+                    if k != "token"
+                ])
+                path = scope["path"] + (f"?{query}" if query else "")
+                print(f"Slow request {scope['method']} {path} took {total_ms:.1f}ms: {timings.header()}")
@@ -0,0 +1,171 @@
+"""
+Rate-limit-aware pool of GitHub tokens
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional
+
+# Budgets assumed for a token before GitHub has told us otherwise
+DEFAULT_LIMITS = {"core": 5000, "graphql": 5000, "search": 30}
+ANONYMOUS_LIMITS = {"core": 60, "graphql": 0, "search": 10}
+
+# How long a caller may queue for a budget reset before getting RateLimitExhausted
+MAX_WAIT = float(os.getenv("GITCANVAS_TOKEN_MAX_WAIT", "2"))
+
+
+class RateLimitExhausted(Exception):
+    """Every token is out of budget for the resource until `reset_at`."""
+
+    def __init__(self, resource: str, reset_at: float):
+        super().__init__(f"GitHub {resource} rate limit exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}")
+        self.resource = resource
+        self.reset_at = reset_at
+
+
+class _Budget:
+    __slots__ = ("limit", "remaining", "reset_at")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def available(self, now: float) -> int:
+        if self.reset_at and now >= self.reset_at:
+            # The window rolled over since we last heard from GitHub
+            self.remaining = self.limit
+            self.reset_at = 0.0
+        return self.remaining
+
+
+class TokenPool:
+    """
+    Tracks the remaining REST/GraphQL budget of each token from the
+    X-RateLimit-* response headers and hands out the token with the most
+    headroom. `None` stands for unauthenticated access (60 req/hr).
+    """
+
+    def __init__(self, tokens: List[Optional[str]]):
+        self.tokens = list(tokens) or [None]
+        self._budgets: Dict[Optional[str], Dict[str, _Budget]] = {}
+        self._lock = threading.Lock()
+        for token in self.tokens:
+            limits = DEFAULT_LIMITS if token else ANONYMOUS_LIMITS
+            self._budgets[token] = {name: _Budget(limit) for name, limit in limits.items()}
+
+    @classmethod
+    def from_env(cls) -> "TokenPool":
+        """Tokens from GITHUB_TOKENS (comma-separated) plus GITHUB_TOKEN."""
+        tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
+        single = os.getenv("GITHUB_TOKEN")
+        if single and single not in tokens:
+            tokens.append(single)
+        return cls(tokens)
+
+    @property
+    def authenticated(self) -> bool:
+        return any(self.tokens)
+
+    def _budget(self, token, resource) -> _Budget:
+        budgets = self._budgets[token]
+        if resource not in budgets:
+            budgets[resource] = _Budget((DEFAULT_LIMITS if token else ANONYMOUS_LIMITS).get(resource, 60))
+        return budgets[resource]
+
+    def acquire(self, resource: str = "core") -> Optional[str]:
+        """
+        Reserve one call against the token with the most headroom.
+        Raises RateLimitExhausted if no token has budget left.
+        """
+        now = time.time()
+        with self._lock:
+            best, best_remaining = None, 0
+            for token in self.tokens:
+                remaining = self._budget(token, resource).available(now)
+                if remaining > best_remaining:
+                    best, best_remaining = token, remaining
+            if best_remaining <= 0:
+                raise RateLimitExhausted(resource, self.next_reset(resource))
+            # Reserve optimistically so concurrent callers spread across tokens
+            self._budget(best, resource).remaining -= 1
+            return best
+
+    async def aacquire(self, resource: str = "core", max_wait: float = MAX_WAIT) -> Optional[str]:
+        """acquire(), but queue for up to `max_wait` seconds if a reset is imminent."""
+        try:
+            return self.acquire(resource)
+        except RateLimitExhausted as e:
+            wait = e.reset_at - time.time()
+            if wait > max_wait:
+                raise
+            await asyncio.sleep(max(wait, 0))
+            return self.acquire(resource)
+
+    def next_reset(self, resource: str = "core") -> float:
+        resets = [self._budget(t, resource).reset_at for t in self.tokens]
+        resets = [r for r in resets if r]
+        return min(resets) if resets else time.time()
+
+    def update(self, token: Optional[str], headers: Mapping[str, str], resource: Optional[str] = None):
+        """Record GitHub's view of the token's budget from response headers."""
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None or token not in self._budgets:
+            return
+        resource = headers.get("x-ratelimit-resource") or resource or "core"
+        with self._lock:
+            budget = self._budget(token, resource)
+            try:
+                budget.remaining = int(remaining)
+                budget.limit = int(headers.get("x-ratelimit-limit", budget.limit))
+                budget.reset_at = float(headers.get("x-ratelimit-reset", budget.reset_at))
+            except ValueError:
+                pass
+
+    def total_limit(self, resource: str = "core") -> int:
+        """Summed hourly limit of every token in the pool for `resource`."""
+        with self._lock:
+            return sum(self._budget(t, resource).limit for t in self.tokens)
+
+    def headroom(self, resource: str = "core") -> float:
+        """Fraction of the pool's total budget still available for `resource`."""
+        now = time.time()
+        with self._lock:
+            budgets = [self._budget(t, resource) for t in self.tokens]
+            limit = sum(b.limit for b in budgets)
+            remaining = sum(max(b.available(now), 0) for b in budgets)
+        return remaining / limit if limit else 0.0
+
+    def snapshot(self) -> list:
+        """Per-token budgets for the health endpoint, with tokens masked."""
+        now = time.time()
+        out = []
+        with self._lock:
+            for token in self.tokens:
+                out.append({
+                    "token": f"...{token[-4:]}" if token else "anonymous",
+                    "budgets": {
+                        name: {
+                            "limit": b.limit,
+                            "remaining": b.available(now),
+                            "reset_at": int(b.reset_at) if b.reset_at else None,
+                        }
+                        for name, b in self._budgets[token].items()
+                    },
+                })
+        return out
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> TokenPool:
+    """The process-wide pool, built from the environment on first use (after load_dotenv)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TokenPool.from_env()
+        return _pool